@@ -1,8 +1,21 @@
+from __future__ import with_statement
 import Live
+import heapq
 from _Framework.ControlSurface import ControlSurface
+from MIDIOutputScheduler import MIDIOutputScheduler, element_key, METER_PRIORITY
+from CallbackProfiler import CallbackProfiler
+from LatencyTracer import LatencyTracer
+from RebuildTransaction import RebuildTransaction
+from SongModel import SongModel
 MANUFACTURER_ID = 71
 ABLETON_MODE = 65
 DO_COMBINE = Live.Application.combine_apcs() #requires 8.2 & higher
+# Time the hot callbacks and log a summary now and then. Costs nothing when off
+PROFILE_CALLBACKS = False
+# Keep a histogram per control of the time from input to the first LED feedback sent
+TRACE_LATENCY = False
+# Live calls the timer about every 100ms
+TICKS_PER_SECOND = 10
 
 class APC(ControlSurface):
 
@@ -13,15 +26,53 @@ class APC(ControlSurface):
         support_devices = False
         for instance in APC._active_instances:
             support_devices |= (instance._device_component != None)
-        track_offset = 0
-        for instance in APC._active_instances:
-            instance._activate_combination_mode(track_offset, support_devices)
-            track_offset += instance._session.width()
+        # Relinking one session moves the sessions linked to it, so every instance holds its rebuild until all are relinked
+        transactions = [ instance.rebuild_transaction() for instance in APC._active_instances ]
+        for transaction in transactions:
+            transaction.__enter__()
+        try:
+            track_offset = 0
+            for instance in APC._active_instances:
+                instance._activate_combination_mode(track_offset, support_devices)
+                track_offset += instance._session.width()
+        finally:
+            for transaction in transactions:
+                transaction.__exit__(None, None, None)
 
     _combine_active_instances = staticmethod(_combine_active_instances)
 
     def __init__(self, c_instance):
+        # The wrappers have to be in place before anything binds the callbacks, and the
+        # base class already hands _send_midi to the elements
+        self._profiler = None
+        if PROFILE_CALLBACKS:
+            self._profiler = CallbackProfiler(self.log_message)
+            self._profiler.install(self._profiled_methods())
+        # Registered ahead of the base class's listeners, so the lists are fresh by the time
+        # the components hear about a track or scene list change
+        self._song_model = SongModel(c_instance.song())
         ControlSurface.__init__(self, c_instance)
+        self._tracer = None
+        if TRACE_LATENCY:
+            self._tracer = LatencyTracer(self.log_message)
+        # Short messages go out through a prioritised queue, flushed first thing every tick
+        self._output = MIDIOutputScheduler(self._transmit_midi)
+        self._send_priority = None
+        self._output.set_drop_callback(self._on_send_dropped)
+        # The script's only timer callback. Everything else that waits for ticks goes in the
+        # deadline heap as [tick due, sequence number, callback] and costs nothing until it is due
+        self._ticks = 0
+        self._task_sequence = 0
+        self._tasks = []
+        self._register_timer_callback(self._on_timer)
+        self.rebuilds = 0
+        self.rebuilds_per_second = 0
+        self._rebuilds_this_second = 0
+        # Last value sent per (status, id), so repeats are skipped even when forced
+        self._sent_values = {}
+        self._uncached_keys = {}
+        self.sent_value_hits = 0
+        self.sent_value_misses = 0
         self.set_suppress_rebuild_requests(True)
         self._suppress_session_highlight = True
         self._suppress_send_midi = True
@@ -46,6 +97,9 @@ class APC(ControlSurface):
 
 
     def disconnect(self):
+        self._unregister_timer_callback(self._on_timer)
+        self._output.clear()
+        self._tasks = []
         self._do_uncombine()
         self._shift_button = None
         self._matrix = None
@@ -53,6 +107,12 @@ class APC(ControlSurface):
         self._session_zoom = None
         self._mixer = None
         ControlSurface.disconnect(self)
+        self._song_model.disconnect()
+        self.dump_latencies()
+        if self._profiler != None:
+            self._profiler.log_summary()
+            self._profiler.uninstall()
+            self._profiler = None
 
 
     def highlighting_session_component(self):
@@ -61,10 +121,49 @@ class APC(ControlSurface):
 
 
     def refresh_state(self):
+        self.invalidate_sent_values()
         ControlSurface.refresh_state(self)
         self.schedule_message(5, self._update_hardware)
 
 
+    def song_model(self):
+        ' The cached track and scene lists. Components should read these instead of the song\'s '
+        return self._song_model
+
+
+    def rebuild_transaction(self):
+        ' with self.rebuild_transaction(): ... requests at most one MIDI map rebuild for the whole block '
+        return RebuildTransaction(self)
+
+
+    def build_midi_map(self, midi_map_handle):
+        self.rebuilds += 1
+        self._rebuilds_this_second += 1
+        ControlSurface.build_midi_map(self, midi_map_handle)
+
+
+    def receive_midi(self, midi_bytes):
+        if (self._tracer != None) and (len(midi_bytes) == 3):
+            status = midi_bytes[0]
+            if (status & 240) == 128:
+                status += 16
+            control = self._forwarding_registry.get((status, midi_bytes[1]))
+            if control != None:
+                self._tracer.on_input(control.name, self._feedback_keys(control))
+        ControlSurface.receive_midi(self, midi_bytes)
+
+
+    def _feedback_keys(self, control):
+        ' The (status, id) of the messages that count as feedback to control when tracing latency: its own LED '
+        return (element_key(control),)
+
+
+    def dump_latencies(self):
+        ' Logs the input to feedback latencies traced so far, if TRACE_LATENCY is on '
+        if self._tracer != None:
+            self._tracer.dump()
+
+
     def handle_sysex(self, midi_bytes):
         self._suppress_send_midi = False
         if ((midi_bytes[3] == 6) and (midi_bytes[4] == 2)):
@@ -107,6 +206,7 @@ class APC(ControlSurface):
 
 
     def _on_handshake_successful(self):
+        self.invalidate_sent_values()
         self._suppress_session_highlight = False
         for component in self.components:
             component.set_enabled(True)
@@ -115,13 +215,14 @@ class APC(ControlSurface):
 
 
     def _update_hardware(self):
+        self._output.clear()
+        self.invalidate_sent_values()
         self._suppress_send_midi = True
         self._suppress_session_highlight = True
-        self.set_suppress_rebuild_requests(True)
-        for component in self.components:
-            component.set_enabled(False)
+        with self.rebuild_transaction():
+            for component in self.components:
+                component.set_enabled(False)
 
-        self.set_suppress_rebuild_requests(False)
         self._suppress_send_midi = False
         self._do_uncombine()
         self._send_midi((240, 126, 0, 6, 1, 247))
@@ -138,10 +239,87 @@ class APC(ControlSurface):
     def _send_midi(self, midi_bytes):
         sent_successfully = False
         if not self._suppress_send_midi:
-            sent_successfully = ControlSurface._send_midi(self, midi_bytes)
+            if len(midi_bytes) == 3:
+                key = (midi_bytes[0], midi_bytes[1])
+                if self._sent_values.get(key) == midi_bytes[2]:
+                    self.sent_value_hits += 1
+                    sent_successfully = True
+                else:
+                    self.sent_value_misses += 1
+                    sent_successfully = self._output.send(midi_bytes, self._send_priority)
+                    if sent_successfully and (key not in self._uncached_keys):
+                        self._sent_values[key] = midi_bytes[2]
+            else:
+                sent_successfully = ControlSurface._send_midi(self, midi_bytes)
+        return sent_successfully
+
+
+    def invalidate_sent_values(self):
+        self._sent_values = {}
+
+
+    def set_uncached(self, element):
+        ' For elements whose LEDs Live also drives, e.g. encoders mapped to parameters '
+        self._uncached_keys[element_key(element)] = True
+
+
+    def _on_send_dropped(self, midi_bytes):
+        key = (midi_bytes[0], midi_bytes[1])
+        if key in self._sent_values:
+            del self._sent_values[key]
+
+
+    def _transmit_midi(self, midi_bytes, priority):
+        sent_successfully = ControlSurface._send_midi(self, midi_bytes)
+        if sent_successfully and (self._tracer != None) and (priority != METER_PRIORITY):
+            self._tracer.on_output((midi_bytes[0], midi_bytes[1]))
         return sent_successfully
 
 
+    def schedule(self, delay_ticks, callback):
+        ' Calls callback once, delay_ticks timer ticks from now. Returns a handle for cancel '
+        assert (delay_ticks > 0)
+        assert (callback != None)
+        self._task_sequence += 1
+        task = [self._ticks + delay_ticks, self._task_sequence, callback]
+        heapq.heappush(self._tasks, task)
+        return task
+
+
+    def ticks_until(self, task):
+        ' Ticks left before a scheduled task is due, at least 1 '
+        return max(1, task[0] - self._ticks)
+
+
+    def cancel(self, task):
+        ' Cancelled tasks stay in the heap until they are due, but are skipped '
+        if task != None:
+            task[2] = None
+
+
+    def _on_timer(self):
+        self._output.flush()
+        self._ticks += 1
+        if (self._ticks % TICKS_PER_SECOND) == 0:
+            self.rebuilds_per_second = self._rebuilds_this_second
+            self._rebuilds_this_second = 0
+        while (len(self._tasks) > 0) and (self._tasks[0][0] <= self._ticks):
+            task = heapq.heappop(self._tasks)
+            callback = task[2]
+            if callback != None:
+                task[2] = None
+                callback()
+        if self._profiler != None:
+            self._profiler.on_tick()
+        if self._tracer != None:
+            self._tracer.on_tick()
+
+
+    def _profiled_methods(self):
+        ' (class, method name) pairs timed when PROFILE_CALLBACKS is on '
+        return ((self.__class__, '_send_midi'), (self.__class__, '_on_timer'))
+
+
     def _send_introduction_message(self, mode_byte = ABLETON_MODE):
         self._send_midi((240,
          MANUFACTURER_ID,
@@ -170,7 +348,8 @@ class APC(ControlSurface):
     def _do_uncombine(self):
         if self in APC._active_instances:
             APC._active_instances.remove(self)
-            self._session.unlink()
+            with self.rebuild_transaction():
+                self._session.unlink()
             APC._combine_active_instances()
 
 
@@ -21,6 +21,10 @@ from ShiftableTransportComponent import ShiftableTransportComponent
 from ShiftTranslatorComponent import ShiftTranslatorComponent
 from PedaledSessionComponent import PedaledSessionComponent
 from SpecialMixerComponent import SpecialMixerComponent
+from LEDCompositor import LEDCompositor
+from MIDIOutputScheduler import RING_PRIORITY, element_key
+from ModifierBus import ModifierBus, MODIFIES_MAPPING, MODIFIES_LEDS
+from BankRepeater import BankRepeater
 
 from VUMeters import VUMeters
 
@@ -31,9 +35,65 @@ class APC40(APC):
         APC.__init__(self, c_instance)
         self._device_selection_follows_track_selection = True
 
+    def disconnect(self):
+        self._bank_repeater.disconnect()
+        self._shift_bus.disconnect()
+        APC.disconnect(self)
+
+    def refresh_state(self):
+        self._shift_bus.reset()
+        APC.refresh_state(self)
+
+    def _update_hardware(self):
+        self._shift_bus.reset()
+        APC._update_hardware(self)
+
+    def _send_midi(self, midi_bytes):
+        if not self._compositor.capture(midi_bytes):
+            return False
+        return APC._send_midi(self, midi_bytes)
+
+    def _profiled_methods(self):
+        return APC._profiled_methods(self) + ((VUMeters, 'observe'),
+         (DetailViewCntrlComponent, '_shift_value'),
+         (ShiftableDeviceComponent, '_shift_value'),
+         (ShiftableTransportComponent, '_shift_value'),
+         (ShiftTranslatorComponent, '_shift_value'),
+         (EncModeSelectorComponent, 'update'),
+         (ShiftableDeviceComponent, 'update'))
+
+    # Meter frames the output queue gives up on are redrawn on the next frame
+    def _on_send_dropped(self, midi_bytes):
+        APC._on_send_dropped(self, midi_bytes)
+        self._compositor.forget(midi_bytes)
+
+    # The pedal has no LED of its own. It fires the highlighted slot, whose pad is in the selected scene's row
+    def _feedback_keys(self, control):
+        if control == self._slot_launch_button:
+            row = self._selected_scene_row()
+            if row < 0:
+                return ()
+            return tuple([ element_key(button) for button in self._button_rows[row] ])
+        return APC._feedback_keys(self, control)
+
+    def _selected_scene_row(self):
+        scenes = self.song_model().scenes()
+        selected_scene = self.song().view.selected_scene
+        for index in range(len(scenes)):
+            if scenes[index] == selected_scene:
+                row = index - self._session.scene_offset()
+                if row < self._session.height():
+                    return row
+                return -1
+        return -1
+
     def _setup_session_control(self):
         is_momentary = True
+        # Clip feedback sits at the bottom; the VU meters and the clip warning are drawn over it
+        self._compositor = LEDCompositor()
         self._shift_button = ButtonElement(is_momentary, MIDI_NOTE_TYPE, 0, 98)        
+        # Everything that reacts to shift hears about it through the bus, once per press or release
+        self._shift_bus = ModifierBus(self, self._shift_button)
         right_button = ButtonElement(is_momentary, MIDI_NOTE_TYPE, 0, 96)
         left_button = ButtonElement(is_momentary, MIDI_NOTE_TYPE, 0, 97)
         up_button = ButtonElement(is_momentary, MIDI_NOTE_TYPE, 0, 94)
@@ -42,7 +102,7 @@ class APC40(APC):
         left_button.name = 'Bank_Select_Left_Button'
         up_button.name = 'Bank_Select_Up_Button'
         down_button.name = 'Bank_Select_Down_Button'
-        self._session = PedaledSessionComponent(8, 5)
+        self._session = PedaledSessionComponent(self, 8, 5)
         self._session.name = 'Session_Control'
         self._session.set_track_bank_buttons(right_button, left_button)
         self._session.set_scene_bank_buttons(down_button, up_button)
@@ -83,22 +143,28 @@ class APC40(APC):
             matrix.add_row(tuple(button_row))
             self._button_rows.append(button_row)
 
-        self._session.set_slot_launch_button(ButtonElement(is_momentary, MIDI_CC_TYPE, 0, 67))
+        self._slot_launch_button = ButtonElement(is_momentary, MIDI_CC_TYPE, 0, 67)
+        self._slot_launch_button.name = 'Slot_Launch_Button'
+        self._session.set_slot_launch_button(self._slot_launch_button)
         self._session.selected_scene().name = 'Selected_Scene'
         self._session.selected_scene().set_launch_button(ButtonElement(is_momentary, MIDI_CC_TYPE, 0, 64))
         self._session_zoom = SessionZoomingComponent(self._session)
         self._session_zoom.name = 'Session_Overview'
         self._session_zoom.set_button_matrix(matrix)
         self._session_zoom.set_zoom_button(self._shift_button)
+        self._shift_bus.take_over(self._session_zoom._zoom_value, MODIFIES_MAPPING | MODIFIES_LEDS)
         self._session_zoom.set_nav_buttons(up_button, down_button, left_button, right_button)
         self._session_zoom.set_scene_bank_buttons(tuple(scene_launch_buttons))
         self._session_zoom.set_stopped_value(3)
         self._session_zoom.set_selected_value(5)
+        # Holding a bank button repeats, in the session and in the overview, one ring move per tick
+        self._bank_repeater = BankRepeater(self, self._session, self._session_zoom, self._shift_bus)
+        self._bank_repeater.set_bank_buttons(up_button, down_button, left_button, right_button)
         return None   
 
     def _setup_mixer_control(self):
         is_momentary = True
-        self._mixer = SpecialMixerComponent(8)
+        self._mixer = SpecialMixerComponent(self, 8)
         self._mixer.name = 'Mixer'
         self._mixer.master_strip().name = 'Master_Channel_Strip'
         self._mixer.selected_strip().name = 'Selected_Channel_Strip'
@@ -123,6 +189,7 @@ class APC40(APC):
             strip.set_mute_button(mute_button)
             strip.set_select_button(select_button)
             strip.set_shift_button(self._shift_button)
+            self._shift_bus.take_over(strip._shift_value, MODIFIES_LEDS)
             strip.set_invert_mute_feedback(True)
         crossfader = SliderElement(MIDI_CC_TYPE, 0, 15)
         master_volume_control = SliderElement(MIDI_CC_TYPE, 0, 14)
@@ -152,20 +219,26 @@ class APC40(APC):
             device_bank_buttons[-1].name = bank_button_labels[index]
             ring_mode_button = ButtonElement(not is_momentary, MIDI_CC_TYPE, 0, 24 + index)
             ringed_encoder = RingedEncoderElement(MIDI_CC_TYPE, 0, 16 + index, Live.MidiMap.MapMode.absolute)
+            ringed_encoder.set_scheduler(self)
             ringed_encoder.set_ring_mode_button(ring_mode_button)
             ringed_encoder.name = 'Device_Control_' + str(index)
             ring_mode_button.name = ringed_encoder.name + '_Ring_Mode_Button'
+            self._output.set_element_priority(ringed_encoder, RING_PRIORITY)
+            self._output.set_element_priority(ring_mode_button, RING_PRIORITY)
+            self.set_uncached(ringed_encoder)
             device_param_controls.append(ringed_encoder)
-        device = ShiftableDeviceComponent()
+        device = ShiftableDeviceComponent(self)
         device.name = 'Device_Component'
         device.set_bank_buttons(tuple(device_bank_buttons))
         device.set_shift_button(self._shift_button)
+        self._shift_bus.take_over(device._shift_value, MODIFIES_MAPPING | MODIFIES_LEDS)
         device.set_parameter_controls(tuple(device_param_controls))
         device.set_on_off_button(device_bank_buttons[1])
         self.set_device_component(device)
         detail_view_toggler = DetailViewCntrlComponent(self)
         detail_view_toggler.name = 'Detail_View_Control'
         detail_view_toggler.set_shift_button(self._shift_button)
+        self._shift_bus.take_over(detail_view_toggler._shift_value, MODIFIES_LEDS)
         detail_view_toggler.set_device_clip_toggle_button(device_bank_buttons[0])
         detail_view_toggler.set_detail_toggle_button(device_bank_buttons[4])
         detail_view_toggler.set_device_nav_buttons(device_bank_buttons[2], device_bank_buttons[3])
@@ -188,6 +261,7 @@ class APC40(APC):
         nudge_down_button.name = 'Nudge_Down_Button'
         tap_tempo_button.name = 'Tap_Tempo_Button'
         transport.set_shift_button(self._shift_button)
+        self._shift_bus.take_over(transport._shift_value, MODIFIES_LEDS)
         transport.set_play_button(play_button)
         transport.set_stop_button(stop_button)
         transport.set_record_button(record_button)
@@ -199,6 +273,7 @@ class APC40(APC):
         bank_button_translator = ShiftTranslatorComponent()
         bank_button_translator.set_controls_to_translate(tuple(device_bank_buttons))
         bank_button_translator.set_shift_button(self._shift_button)
+        self._shift_bus.take_over(bank_button_translator._shift_value, MODIFIES_MAPPING)
 
     def _setup_global_control(self):
         is_momentary = True
@@ -207,8 +282,12 @@ class APC40(APC):
         for index in range(8):
             ring_button = ButtonElement(not is_momentary, MIDI_CC_TYPE, 0, 56 + index)
             ringed_encoder = RingedEncoderElement(MIDI_CC_TYPE, 0, 48 + index, Live.MidiMap.MapMode.absolute)
+            ringed_encoder.set_scheduler(self)
             ringed_encoder.name = 'Track_Control_' + str(index)
             ring_button.name = ringed_encoder.name + '_Ring_Mode_Button'
+            self._output.set_element_priority(ringed_encoder, RING_PRIORITY)
+            self._output.set_element_priority(ring_button, RING_PRIORITY)
+            self.set_uncached(ringed_encoder)
             ringed_encoder.set_ring_mode_button(ring_button)
             global_param_controls.append(ringed_encoder)
         global_bank_buttons = []
@@ -216,7 +295,7 @@ class APC40(APC):
         for index in range(4):
             global_bank_buttons.append(ButtonElement(not is_momentary, MIDI_NOTE_TYPE, 0, 87 + index))
             global_bank_buttons[-1].name = global_bank_labels[index]
-        encoder_modes = EncModeSelectorComponent(self._mixer)
+        encoder_modes = EncModeSelectorComponent(self, self._mixer, len(global_bank_buttons) - 1)
         encoder_modes.name = 'Track_Control_Modes'
         encoder_modes.set_modes_buttons(global_bank_buttons)
         encoder_modes.set_controls(tuple(global_param_controls))
@@ -1,11 +1,61 @@
 
+from __future__ import with_statement
 import Live 
 from _Framework.SessionComponent import SessionComponent 
+from CachedSceneComponent import CachedSceneComponent 
 class APCSessionComponent(SessionComponent):
     " Special SessionComponent for the APC controllers' combination mode "
 
-    def __init__(self, num_tracks, num_scenes):
+    def __init__(self, parent, num_tracks, num_scenes):
+        self._parent = parent
+        # Clip slot states by absolute (track, scene) index, for the slots inside the ring only.
+        # Scrolling keeps the states of the slots that stay in view, so only newly exposed ones are queried
+        self._slot_states = {}
         SessionComponent.__init__(self, num_tracks, num_scenes)
+        for scene_index in range(num_scenes):
+            for track_index in range(num_tracks):
+                self.scene(scene_index).clip_slot(track_index).set_ring_position(track_index, scene_index)
+
+    def disconnect(self):
+        SessionComponent.disconnect(self)
+        self._slot_states = {}
+
+    def cached_slot_state(self, track_index, scene_index):
+        return self._slot_states.get((self._track_offset + track_index, self._scene_offset + scene_index))
+
+    def cache_slot_state(self, track_index, scene_index, state):
+        self._slot_states[(self._track_offset + track_index, self._scene_offset + scene_index)] = state
+
+    def forget_slot_state(self, track_index, scene_index):
+        key = (self._track_offset + track_index, self._scene_offset + scene_index)
+        if key in self._slot_states:
+            del self._slot_states[key]
+
+    # Moving the ring reassigns every clip slot, scene and strip; that should be one rebuild
+    def _change_offsets(self, track_increment, scene_increment):
+        with self._parent.rebuild_transaction():
+            SessionComponent._change_offsets(self, track_increment, scene_increment)
+        self._prune_slot_states()
+
+    # Slots that left the ring aren't observed any more, so their states can't be trusted later
+    def _prune_slot_states(self):
+        track_end = self._track_offset + self.width()
+        scene_end = self._scene_offset + self.height()
+        for key in self._slot_states.keys():
+            if not ((self._track_offset <= key[0] < track_end) and (self._scene_offset <= key[1] < scene_end)):
+                del self._slot_states[key]
+
+    # Inserting or deleting tracks and scenes shifts the absolute indices under every state
+    def on_track_list_changed(self):
+        self._slot_states = {}
+        SessionComponent.on_track_list_changed(self)
+
+    def on_scene_list_changed(self):
+        self._slot_states = {}
+        SessionComponent.on_scene_list_changed(self)
+
+    def _create_scene(self, num_tracks):
+        return CachedSceneComponent(self, num_tracks, self.tracks_to_use)
 
     def link_with_track_offset(self, track_offset):
         assert (track_offset >= 0)
@@ -0,0 +1,66 @@
+from _Generic.Devices import *
+
+# Enough for the instruments and effects of a typical set
+BANK_LAYOUT_CACHE_SIZE = 16
+
+class BankLayoutCache(object):
+    """ Least recently used cache of parameter bank layouts, keyed by device class and parameter
+        count. A layout holds the number of banks, the banks as indices into device.parameters
+        and the bank names, so any device of the same kind can be mapped without a rebuild """
+
+    def __init__(self, device_banks = DEVICE_DICT, device_bank_names = BANK_NAME_DICT, size = BANK_LAYOUT_CACHE_SIZE):
+        assert (size > 0)
+        self._device_banks = device_banks
+        self._device_bank_names = device_bank_names
+        self._size = size
+        self._layouts = {}
+        # Keys, least recently used first
+        self._keys = []
+        self.hits = 0
+        self.misses = 0
+
+
+    def layout(self, device):
+        assert (device != None)
+        key = self._key(device)
+        if key in self._layouts:
+            self.hits += 1
+            self._keys.remove(key)
+        else:
+            self.misses += 1
+            self._layouts[key] = self._build_layout(device)
+            if len(self._keys) >= self._size:
+                del self._layouts[self._keys.pop(0)]
+        self._keys.append(key)
+        return self._layouts[key]
+
+
+    def forget(self, device):
+        ' Called when the device\'s parameters change '
+        key = self._key(device)
+        if key in self._layouts:
+            del self._layouts[key]
+            self._keys.remove(key)
+
+
+    # Only built-in devices are cached, and those have a fixed set of parameters per class
+    def _key(self, device):
+        return (device.class_name, len(device.parameters))
+
+
+    def _build_layout(self, device):
+        parameter_indices = {}
+        parameters = device.parameters
+        for index in range(len(parameters)):
+            parameter_indices[parameters[index]] = index
+        banks = []
+        for bank in parameter_banks(device, self._device_banks):
+            indices = []
+            for parameter in bank:
+                if parameter != None:
+                    indices.append(parameter_indices[parameter])
+                else:
+                    indices.append(-1)
+            banks.append(tuple(indices))
+        bank_names = tuple(parameter_bank_names(device, self._device_bank_names))
+        return (number_of_parameter_banks(device, self._device_banks), tuple(banks), bank_names)
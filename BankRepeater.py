@@ -0,0 +1,125 @@
+from _Framework.ButtonElement import ButtonElement
+
+# Ticks a bank button has to be held before it starts repeating
+REPEAT_DELAY_TICKS = 3
+# While held, the steps per tick double every this many ticks, up to MAX_REPEAT_STEPS
+ACCELERATION_TICKS = 5
+MAX_REPEAT_STEPS = 8
+
+class BankRepeater(object):
+    """ The only listener on the bank buttons. Takes over the session's and the session overview's
+        listeners, repeats held buttons with acceleration, and moves the ring at most once per tick """
+
+    def __init__(self, parent, session, session_zoom, modifier_bus):
+        self._parent = parent
+        self._session = session
+        self._session_zoom = session_zoom
+        self._modifier_bus = modifier_bus
+        self._directions = {}
+        self._held = {}
+        self._taken = []
+        # Steps to take with the next move, in rows or columns of the ring (or whole rings when zoomed out)
+        self._pending = [0, 0]
+        self._tick_task = None
+
+
+    def disconnect(self):
+        ' Hands the listeners back to the buttons, so the components can remove them as usual '
+        self._parent.cancel(self._tick_task)
+        self._tick_task = None
+        for button in self._directions.keys():
+            button.remove_value_listener(self._bank_value)
+        for button, callback, identify_sender in self._taken:
+            button.add_value_listener(callback, identify_sender)
+        self._taken = []
+        self._directions = {}
+        self._held = {}
+
+
+    def set_bank_buttons(self, up, down, left, right):
+        assert (len(self._directions) == 0)
+        session_callbacks = (self._session._bank_up_value, self._session._bank_down_value, self._session._bank_left_value, self._session._bank_right_value)
+        directions = ((0, -1), (0, 1), (-1, 0), (1, 0))
+        buttons = (up, down, left, right)
+        for index in range(len(buttons)):
+            button = buttons[index]
+            assert isinstance(button, ButtonElement)
+            self._take_over(button, session_callbacks[index], False)
+            self._take_over(button, self._session_zoom._nav_value, True)
+            self._directions[button] = directions[index]
+            button.add_value_listener(self._bank_value, True)
+
+
+    def _take_over(self, button, callback, identify_sender):
+        if button.value_has_listener(callback):
+            button.remove_value_listener(callback)
+            self._taken.append((button, callback, identify_sender))
+
+
+    def _bank_value(self, value, sender):
+        assert (value in range(128))
+        if not sender.is_momentary():
+            # A toggle never reports a release, so every message is a single step that doesn't repeat
+            self._step(sender)
+        elif value != 0:
+            if sender not in self._held:
+                self._held[sender] = 0
+                self._step(sender)
+        elif sender in self._held:
+            del self._held[sender]
+
+
+    def _step(self, button):
+        self._add_steps(self._directions[button], 1)
+        # An idle repeater moves right away; otherwise the step goes with the next tick
+        if self._tick_task == None:
+            self._move()
+            self._tick_task = self._parent.schedule(1, self._on_tick)
+
+
+    def _on_tick(self):
+        self._tick_task = None
+        for button, ticks in self._held.items():
+            ticks += 1
+            self._held[button] = ticks
+            if ticks >= REPEAT_DELAY_TICKS:
+                self._add_steps(self._directions[button], min(MAX_REPEAT_STEPS, 1 << ((ticks - REPEAT_DELAY_TICKS) / ACCELERATION_TICKS)))
+        moved = self._move()
+        if moved or (len(self._held) > 0):
+            self._tick_task = self._parent.schedule(1, self._on_tick)
+
+
+    def _add_steps(self, direction, steps):
+        self._pending[0] += (direction[0] * steps)
+        self._pending[1] += (direction[1] * steps)
+
+
+    # The ring moves a row or column at a time, or a whole ring at a time in the session overview
+    def _units(self):
+        if self._session_zoom.is_enabled() and self._modifier_bus.is_pressed():
+            return (self._session.width(), self._session.height())
+        elif self._session.is_enabled():
+            return (1, 1)
+        return None
+
+
+    def _move(self):
+        ' Takes all pending steps with one set_offsets. Returns whether there were any '
+        track_steps, scene_steps = self._pending
+        self._pending = [0, 0]
+        units = self._units()
+        if (units == None) or ((track_steps == 0) and (scene_steps == 0)):
+            return False
+        track_offset = self._clamp(self._session.track_offset(), track_steps, units[0], len(self._session.tracks_to_use()))
+        scene_offset = self._clamp(self._session.scene_offset(), scene_steps, units[1], len(self._parent.song_model().scenes()))
+        if (track_offset, scene_offset) != (self._session.track_offset(), self._session.scene_offset()):
+            self._session.set_offsets(track_offset, scene_offset)
+        return True
+
+
+    def _clamp(self, offset, steps, unit, length):
+        target = (offset + (steps * unit))
+        if (steps > 0) and (target >= length):
+            # As far as whole steps go without leaving the set
+            target = (offset + (max(0, ((length - 1) - offset) / unit) * unit))
+        return max(0, target)
@@ -0,0 +1,88 @@
+import Live
+from _Framework.ClipSlotComponent import ClipSlotComponent
+# What a clip slot's LED shows. The session keeps one per slot in its ring
+SLOT_EMPTY = 0
+SLOT_STOPPED = 1
+SLOT_TRIGGERED_TO_PLAY = 2
+SLOT_TRIGGERED_TO_RECORD = 3
+SLOT_PLAYING = 4
+SLOT_RECORDING = 5
+class CachedClipSlotComponent(ClipSlotComponent):
+    """ ClipSlotComponent that reads the slot's state from the session's cache, so a slot that
+        only moved to another button when the ring scrolled is not queried from Live again """
+
+    def __init__(self, session):
+        ClipSlotComponent.__init__(self)
+        self._session = session
+        self._track_index = -1
+        self._scene_index = -1
+
+
+    def set_ring_position(self, track_index, scene_index):
+        ' Where in the session ring this slot sits. Slots without one, e.g. the selected scene\'s, are not cached '
+        self._track_index = track_index
+        self._scene_index = scene_index
+
+
+    def update(self):
+        if (self._clip_slot == None) or (self._scene_index < 0):
+            ClipSlotComponent.update(self)
+        else:
+            self._has_fired_slot = False
+            if self._allow_updates:
+                if (self.is_enabled() and (self._launch_button != None)):
+                    state = self._session.cached_slot_state(self._track_index, self._scene_index)
+                    if (state == None):
+                        state = self._slot_state()
+                        self._session.cache_slot_state(self._track_index, self._scene_index, state)
+                    if (state == SLOT_EMPTY):
+                        self._launch_button.turn_off()
+                    else:
+                        self._launch_button.send_value(self._state_value(state))
+            else:
+                self._update_requests += 1
+
+
+    def _slot_state(self):
+        if self._clip_slot.has_clip:
+            clip = self._clip_slot.clip
+            if clip.is_triggered:
+                if clip.will_record_on_start:
+                    return SLOT_TRIGGERED_TO_RECORD
+                return SLOT_TRIGGERED_TO_PLAY
+            elif clip.is_playing:
+                if clip.is_recording:
+                    return SLOT_RECORDING
+                return SLOT_PLAYING
+            return SLOT_STOPPED
+        elif self._clip_slot.is_triggered:
+            if self._clip_slot.will_record_on_start:
+                return SLOT_TRIGGERED_TO_RECORD
+            return SLOT_TRIGGERED_TO_PLAY
+        return SLOT_EMPTY
+
+
+    def _state_value(self, state):
+        return (-1, self._stopped_value, self._triggered_to_play_value, self._triggered_to_record_value, self._started_value, self._recording_value)[state]
+
+
+    # Live reports every change of the slot and its clip here, so these keep the cache current
+    def _forget_state(self):
+        if (self._clip_slot != None) and (self._scene_index >= 0):
+            self._session.forget_slot_state(self._track_index, self._scene_index)
+
+
+    def _on_clip_state_changed(self):
+        self._forget_state()
+        ClipSlotComponent._on_clip_state_changed(self)
+
+
+    def _on_clip_playing_state_changed(self):
+        self._forget_state()
+        ClipSlotComponent._on_clip_playing_state_changed(self)
+
+
+    def _on_slot_triggered_changed(self):
+        self._forget_state()
+        ClipSlotComponent._on_slot_triggered_changed(self)
+
@@ -0,0 +1,14 @@
+from _Framework.SceneComponent import SceneComponent
+from CachedClipSlotComponent import CachedClipSlotComponent
+class CachedSceneComponent(SceneComponent):
+    ' SceneComponent whose clip slots share the session\'s clip slot state cache '
+
+    def __init__(self, session, num_slots, tracks_to_use_callback):
+        # The base class creates the slots, which need the session
+        self._session = session
+        SceneComponent.__init__(self, num_slots, tracks_to_use_callback)
+
+
+    def _create_clip_slot(self):
+        return CachedClipSlotComponent(self._session)
+
@@ -0,0 +1,145 @@
+import sys
+import time
+import math
+from array import array
+
+# Durations are bucketed by powers of two of microseconds: bucket n holds calls shorter than 2**n us
+NUM_BUCKETS = 24
+# Ticks between summaries, about a minute at Live's 100ms timer
+SUMMARY_TICKS = 600
+
+clock = time.time
+if sys.platform == 'win32':
+    clock = time.clock
+
+# (class, method name) -> [original class attribute or None, stats of every profiler timing it].
+# Shared, so several script instances (combination mode) wrap a method once and can uninstall in any
+# order. The wrappers are on the classes, so every profiler counts the calls of every instance
+_wrapped_methods = {}
+
+class CallbackStats(object):
+    ' Call count and duration distribution for one profiled callback '
+
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.total = 0.0
+        self.min = 0.0
+        self.max = 0.0
+        self.buckets = array('i', [0] * NUM_BUCKETS)
+
+
+    def add(self, duration):
+        if (self.count == 0) or (duration < self.min):
+            self.min = duration
+        if duration > self.max:
+            self.max = duration
+        self.count += 1
+        self.total += duration
+        bucket = math.frexp(duration * 1000000)[1]
+        if bucket < 0:
+            bucket = 0
+        elif bucket >= NUM_BUCKETS:
+            bucket = NUM_BUCKETS - 1
+        self.buckets[bucket] += 1
+
+
+    def percentile(self, fraction):
+        ' Upper bound of the bucket holding the given fraction of calls, in seconds '
+        needed = fraction * self.count
+        seen = 0
+        for bucket in range(NUM_BUCKETS):
+            seen += self.buckets[bucket]
+            if seen >= needed:
+                return math.ldexp(1.0, bucket) / 1000000
+        return self.max
+
+
+    def summary(self):
+        mean = 0.0
+        if self.count > 0:
+            mean = self.total / self.count
+        return ('%s n=%d mean=%dus min=%dus max=%dus p99<%dus' % (self.name, self.count, mean * 1000000, self.min * 1000000, self.max * 1000000, self.percentile(0.99) * 1000000))
+
+
+    def reset(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = 0.0
+        self.max = 0.0
+        for bucket in range(NUM_BUCKETS):
+            self.buckets[bucket] = 0
+
+
+class CallbackProfiler(object):
+    """ Times methods by replacing them on their classes with timing wrappers. Nothing is
+        wrapped until install is called, so the script pays nothing when profiling is off """
+
+    def __init__(self, log_callback, summary_ticks = SUMMARY_TICKS):
+        self._log_callback = log_callback
+        self._summary_ticks = summary_ticks
+        self._ticks_until_summary = summary_ticks
+        self._stats = []
+        self._installed = []
+
+
+    def install(self, methods):
+        """ methods is a sequence of (class, method name). Must be called before anything binds
+            the methods, e.g. as listeners or timer callbacks, and uninstalled after they are gone """
+        for cls, name in methods:
+            stats = CallbackStats(cls.__name__ + '.' + name)
+            self._stats.append(stats)
+            key = (cls, name)
+            if key not in _wrapped_methods:
+                sinks = []
+                _wrapped_methods[key] = [cls.__dict__.get(name), sinks]
+                setattr(cls, name, self._make_wrapper(getattr(cls, name).im_func, sinks))
+            _wrapped_methods[key][1].append(stats)
+            self._installed.append((key, stats))
+
+
+    def uninstall(self):
+        ' The last profiler to uninstall a method puts the original back '
+        for key, stats in self._installed:
+            original, sinks = _wrapped_methods[key]
+            sinks.remove(stats)
+            if len(sinks) == 0:
+                del _wrapped_methods[key]
+                cls, name = key
+                if original != None:
+                    setattr(cls, name, original)
+                else:
+                    delattr(cls, name)
+        self._installed = []
+
+
+    def on_tick(self):
+        self._ticks_until_summary -= 1
+        if self._ticks_until_summary <= 0:
+            self._ticks_until_summary = self._summary_ticks
+            self.log_summary()
+
+
+    def log_summary(self):
+        for stats in self._stats:
+            if stats.count > 0:
+                self._log_callback('profile: ' + stats.summary())
+                stats.reset()
+
+
+    def stats(self):
+        return self._stats
+
+
+    def _make_wrapper(self, function, sinks):
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                duration = clock() - start
+                for stats in sinks:
+                    stats.add(duration)
+        wrapper.__name__ = function.__name__
+        wrapper.__doc__ = function.__doc__
+        return wrapper
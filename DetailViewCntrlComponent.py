@@ -16,13 +16,17 @@ class DetailViewCntrlComponent(ControlSurfaceComponent):
         self._right_button = None
         self._shift_button = None
         self._shift_pressed = False
-        self._show_playing_clip_ticks_delay = -1
+        self._parent = parent
+        self._show_playing_clip_task = None
+        # Ticks the task still had to go when shift or disabling paused it
+        self._show_playing_clip_ticks_left = 0
         self.application().view.add_is_view_visible_listener('Detail', self._detail_view_visibility_changed)
-        self._register_timer_callback(self._on_timer)
 
 
     def disconnect(self):
-        self._unregister_timer_callback(self._on_timer)
+        self._parent.cancel(self._show_playing_clip_task)
+        self._show_playing_clip_task = None
+        self._show_playing_clip_ticks_left = 0
         self.application().view.remove_is_view_visible_listener('Detail', self._detail_view_visibility_changed)
         if self._device_clip_toggle_button != None:
             self._device_clip_toggle_button.remove_value_listener(self._device_clip_toggle_value)
@@ -92,6 +96,10 @@ class DetailViewCntrlComponent(ControlSurfaceComponent):
 
 
     def on_enabled_changed(self):
+        if self.is_enabled():
+            self._resume_show_playing_clip()
+        else:
+            self._pause_show_playing_clip()
         self.update()
 
 
@@ -127,10 +135,11 @@ class DetailViewCntrlComponent(ControlSurfaceComponent):
                     self.application().view.show_view('Detail/DeviceChain')
                 else:
                     self.application().view.show_view('Detail/Clip')
+            self._parent.cancel(self._show_playing_clip_task)
+            self._show_playing_clip_task = None
+            self._show_playing_clip_ticks_left = 0
             if (button_is_momentary and (value != 0)):
-                self._show_playing_clip_ticks_delay = SHOW_PLAYING_CLIP_DELAY
-            else:
-                self._show_playing_clip_ticks_delay = -1
+                self._show_playing_clip_task = self._parent.schedule(SHOW_PLAYING_CLIP_DELAY + 1, self._show_playing_clip)
 
 
     def _detail_toggle_value(self, value):
@@ -148,6 +157,10 @@ class DetailViewCntrlComponent(ControlSurfaceComponent):
         assert (self._shift_button != None)
         assert (value in range(128))
         self._shift_pressed = value != 0
+        if self._shift_pressed:
+            self._pause_show_playing_clip()
+        else:
+            self._resume_show_playing_clip()
         self.update()
 
 
@@ -165,14 +178,26 @@ class DetailViewCntrlComponent(ControlSurfaceComponent):
                         direction = Live.Application.Application.View.NavDirection.right
                     self.application().view.scroll_view(direction, 'Detail/DeviceChain', (not modifier_pressed))
 
-    def _on_timer(self):
+    # Like the old timer countdown, the delay only runs while enabled and shift is up
+    def _pause_show_playing_clip(self):
+        if self._show_playing_clip_task != None:
+            self._show_playing_clip_ticks_left = self._parent.ticks_until(self._show_playing_clip_task)
+            self._parent.cancel(self._show_playing_clip_task)
+            self._show_playing_clip_task = None
+
+
+    def _resume_show_playing_clip(self):
+        if (self._show_playing_clip_ticks_left > 0) and self.is_enabled() and (not self._shift_pressed):
+            self._show_playing_clip_task = self._parent.schedule(self._show_playing_clip_ticks_left, self._show_playing_clip)
+            self._show_playing_clip_ticks_left = 0
+
+
+    def _show_playing_clip(self):
+        self._show_playing_clip_task = None
         if (self.is_enabled() and (not self._shift_pressed)):
-            if (self._show_playing_clip_ticks_delay > -1):
-                if (self._show_playing_clip_ticks_delay == 0):
-                    song = self.song()
-                    playing_slot_index = song.view.selected_track.playing_slot_index
-                    if (playing_slot_index > -1):
-                        song.view.selected_scene = song.scenes[playing_slot_index]
-                        if song.view.highlighted_clip_slot.has_clip:
-                            self.application().view.show_view('Detail/Clip')
-                self._show_playing_clip_ticks_delay -= 1
+            song = self.song()
+            playing_slot_index = song.view.selected_track.playing_slot_index
+            if (playing_slot_index > -1):
+                song.view.selected_scene = self._parent.song_model().scenes()[playing_slot_index]
+                if song.view.highlighted_clip_slot.has_clip:
+                    self.application().view.show_view('Detail/Clip')
@@ -1,15 +1,23 @@
 
+from __future__ import with_statement
 from _Framework.ModeSelectorComponent import ModeSelectorComponent 
 from _Framework.ButtonElement import ButtonElement 
 from _Framework.MixerComponent import MixerComponent 
+# Mode table entries: what the encoders control in each mode. Pan, or the index of a send
+PAN_TARGET = -1
 class EncModeSelectorComponent(ModeSelectorComponent):
     ' Class that reassigns encoders on the AxiomPro to different mixer functions '
 
-    def __init__(self, mixer):
+    def __init__(self, parent, mixer, num_sends = 3):
         assert isinstance(mixer, MixerComponent)
+        assert (num_sends >= 0)
         ModeSelectorComponent.__init__(self)
+        self._parent = parent
         self._controls = None
         self._mixer = mixer
+        self._mode_targets = tuple([PAN_TARGET] + range(num_sends))
+        # Strip index -> the (control, target) binding currently installed on it
+        self._installed_bindings = {}
 
 
     def disconnect(self):
@@ -18,6 +26,7 @@ class EncModeSelectorComponent(ModeSelectorComponent):
 
         self._controls = None
         self._mixer = None
+        self._installed_bindings = {}
         ModeSelectorComponent.disconnect(self)
 
 
@@ -41,12 +50,13 @@ class EncModeSelectorComponent(ModeSelectorComponent):
     def set_controls(self, controls):
         assert ((controls == None) or (isinstance(controls, tuple) and (len(controls) == 8)))
         self._controls = controls
+        self._installed_bindings = {}
         self.set_mode(0)
         self.update()
 
 
     def number_of_modes(self):
-        return 4
+        return len(self._mode_targets)
 
 
     def on_enabled_changed(self):
@@ -63,26 +73,22 @@ class EncModeSelectorComponent(ModeSelectorComponent):
                     else:
                         button.turn_off()
             if (self._controls != None):
-                for index in range(len(self._controls)):
-                    if (self._mode_index == 0):
-                        self._mixer.channel_strip(index).set_pan_control(self._controls[index])
-                        self._mixer.channel_strip(index).set_send_controls((None, None, None))
-                    elif (self._mode_index == 1):
-                        self._mixer.channel_strip(index).set_pan_control(None)
-                        self._mixer.channel_strip(index).set_send_controls((self._controls[index],
-                         None,
-                         None))
-                    elif (self._mode_index == 2):
-                        self._mixer.channel_strip(index).set_pan_control(None)
-                        self._mixer.channel_strip(index).set_send_controls((None,
-                         self._controls[index],
-                         None))
-                    elif (self._mode_index == 3):
-                        self._mixer.channel_strip(index).set_pan_control(None)
-                        self._mixer.channel_strip(index).set_send_controls((None,
-                         None,
-                         self._controls[index]))
-                    else:
-                        print 'Invalid mode index'
-                        assert False
+                target = self._mode_targets[self._mode_index]
+                with self._parent.rebuild_transaction():
+                    for index in range(len(self._controls)):
+                        binding = (self._controls[index], target)
+                        if (self._installed_bindings.get(index) != binding):
+                            self._installed_bindings[index] = binding
+                            self._install_binding(self._mixer.channel_strip(index), binding)
+
+
+    def _install_binding(self, strip, binding):
+        control, target = binding
+        send_controls = ([None] * (len(self._mode_targets) - 1))
+        if (target == PAN_TARGET):
+            strip.set_pan_control(control)
+        else:
+            strip.set_pan_control(None)
+            send_controls[target] = control
+        strip.set_send_controls(tuple(send_controls))
 
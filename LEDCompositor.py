@@ -0,0 +1,120 @@
+from _Framework.InputControlElement import *
+from _Framework.ButtonElement import ButtonElement
+from LEDFramebuffer import LEDFramebuffer
+
+# Layers, bottom to top. The session layer holds whatever the script's own components sent
+# (clip feedback, and the mixer and stop buttons under the VU columns)
+SESSION_LAYER = 0
+VU_LAYER = 1
+CLIP_WARNING_LAYER = 2
+NUM_LAYERS = 3
+
+class LEDCompositor(object):
+    ' Stacks overlay layers over buttons and keeps the topmost value on the hardware '
+
+    def __init__(self):
+        self._layers = [ {} for index in range(NUM_LAYERS) ]
+        self._buttons = {}
+        self._framebuffer = LEDFramebuffer()
+        self._is_emitting = False
+        self._forgotten = []
+        self.hidden_sends = 0
+
+
+    def set_value(self, layer, button, value):
+        assert (layer in range(SESSION_LAYER + 1, NUM_LAYERS))
+        assert (value in range(128))
+        self._register_button(button)
+        self._layers[layer][button] = value
+        if self._top_layer(button) == layer:
+            self._emit(button, value)
+
+
+    def clear_value(self, layer, button):
+        assert (layer in range(SESSION_LAYER + 1, NUM_LAYERS))
+        if button in self._layers[layer]:
+            was_on_top = (self._top_layer(button) == layer)
+            del self._layers[layer][button]
+            if was_on_top:
+                self._emit_top(button)
+
+
+    # Removing an overlay re-sends only the pads it covered, from whatever lies underneath
+    def clear(self, layer):
+        for button in self._layers[layer].keys():
+            self.clear_value(layer, button)
+
+
+    # Forget what the hardware shows and re-send every covered button, e.g. after the handshake
+    def refresh(self):
+        self._framebuffer.invalidate()
+        for button in self._buttons.values():
+            if self._top_layer(button) != SESSION_LAYER:
+                self._emit_top(button)
+
+
+    def capture(self, midi_bytes):
+        """ Called with every outgoing message. Records what the components send to covered
+            buttons and returns False when the message is hidden under an overlay """
+        if self._is_emitting or (len(midi_bytes) != 3):
+            return True
+        button = self._buttons.get((midi_bytes[0], midi_bytes[1]))
+        if button == None:
+            return True
+        self._layers[SESSION_LAYER][button] = midi_bytes[2]
+        if self._top_layer(button) != SESSION_LAYER:
+            self.hidden_sends += 1
+            return False
+        return True
+
+
+    def forget(self, midi_bytes):
+        ' Called when a message to a button never made it out. The button is redrawn by redraw_forgotten '
+        button = self._buttons.get((midi_bytes[0], midi_bytes[1]))
+        if (button != None) and (button not in self._forgotten):
+            self._framebuffer.forget(button)
+            button._last_sent_value = -1
+            self._forgotten.append(button)
+
+
+    def redraw_forgotten(self):
+        forgotten = self._forgotten
+        self._forgotten = []
+        for button in forgotten:
+            self._emit_top(button)
+
+
+    def suppressed_sends(self):
+        return self._framebuffer.suppressed_sends
+
+
+    def _register_button(self, button):
+        if button not in self._layers[SESSION_LAYER]:
+            assert isinstance(button, ButtonElement)
+            status_byte = button.message_channel()
+            if button.message_type() == MIDI_NOTE_TYPE:
+                status_byte += MIDI_NOTE_ON_STATUS
+            else:
+                status_byte += MIDI_CC_STATUS
+            self._buttons[(status_byte, button.message_identifier())] = button
+            # Whatever the button shows right now was sent before we were watching it
+            self._layers[SESSION_LAYER][button] = max(button._last_sent_value, 0)
+
+
+    def _top_layer(self, button):
+        for layer in range(NUM_LAYERS - 1, SESSION_LAYER, -1):
+            if button in self._layers[layer]:
+                return layer
+        return SESSION_LAYER
+
+
+    def _emit_top(self, button):
+        self._emit(button, self._layers[self._top_layer(button)][button])
+
+
+    def _emit(self, button, value):
+        self._is_emitting = True
+        try:
+            self._framebuffer.send_value(button, value)
+        finally:
+            self._is_emitting = False
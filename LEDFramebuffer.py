@@ -0,0 +1,33 @@
+from _Framework.ButtonElement import ButtonElement
+
+class LEDFramebuffer(object):
+    ' Remembers the last velocity drawn on each button so unchanged LEDs are not sent again '
+
+    def __init__(self):
+        self._values = {}
+        self.suppressed_sends = 0
+
+
+    def send_value(self, button, value):
+        assert isinstance(button, ButtonElement)
+        # Another component (e.g. a clip slot) may have drawn over the pad since we last did,
+        # in which case the button's own last sent value no longer matches ours
+        if ((self._values.get(button) == value) and (button._last_sent_value == value)):
+            self.suppressed_sends += 1
+        else:
+            self._values[button] = value
+            # Passing True to send_value forces it to happen even when the button in question is MIDI mapped
+            button.send_value(value, True)
+
+
+    def value(self, button):
+        return self._values.get(button, -1)
+
+
+    def invalidate(self):
+        self._values = {}
+
+
+    def forget(self, button):
+        if button in self._values:
+            del self._values[button]
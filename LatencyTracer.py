@@ -0,0 +1,53 @@
+from CallbackProfiler import CallbackStats, clock
+
+# Inputs with no feedback within this many ticks (faders, or an LED that already showed the value) are forgotten
+MAX_TRACE_TICKS = 5
+
+class LatencyTracer(object):
+    """ Measures the time from a press on a control to the first LED feedback that
+        actually leaves the script for it, kept per control name. Each input names the
+        output keys ((status, id) pairs) that count as its feedback; other output doesn't """
+
+    def __init__(self, log_callback, max_trace_ticks = MAX_TRACE_TICKS):
+        self._log_callback = log_callback
+        self._max_trace_ticks = max_trace_ticks
+        self._pending = {}
+        self._stats = {}
+
+
+    def on_input(self, name, feedback_keys):
+        ' Called when a message for the named control comes in '
+        if name not in self._pending:
+            self._pending[name] = [clock(), self._max_trace_ticks, feedback_keys]
+
+
+    def on_output(self, key):
+        ' Called with the (status, id) of every feedback message transmitted, i.e. anything but meter frames '
+        if len(self._pending) > 0:
+            now = None
+            for name, trace in self._pending.items():
+                if key in trace[2]:
+                    if now == None:
+                        now = clock()
+                    if name not in self._stats:
+                        self._stats[name] = CallbackStats(name)
+                    self._stats[name].add(now - trace[0])
+                    del self._pending[name]
+
+
+    def on_tick(self):
+        for name, trace in self._pending.items():
+            trace[1] -= 1
+            if trace[1] <= 0:
+                del self._pending[name]
+
+
+    def stats(self, name):
+        return self._stats.get(name)
+
+
+    def dump(self):
+        names = self._stats.keys()
+        names.sort()
+        for name in names:
+            self._log_callback('latency: ' + self._stats[name].summary())
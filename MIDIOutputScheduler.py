@@ -0,0 +1,122 @@
+from _Framework.InputControlElement import *
+
+# Priorities, most urgent first. Anything not marked otherwise is transport/clip feedback
+FEEDBACK_PRIORITY = 0
+RING_PRIORITY = 1
+METER_PRIORITY = 2
+NUM_PRIORITIES = 3
+
+# Live's timer fires about every 100ms and the APC40's MIDI port manages roughly a thousand
+# short messages a second, so this is about what the hardware can take per tick
+MESSAGES_PER_TICK = 96
+# Queued meter frames older than this many ticks are dropped rather than sent late
+MAX_METER_AGE_TICKS = 2
+
+# The (status, id) key of the messages an element sends. Feedback always goes out on the element's
+# original channel and identifier, even while a translation (e.g. shift) moves what it receives
+def element_key(element):
+    assert isinstance(element, InputControlElement)
+    status_byte = element._original_channel
+    if element.message_type() == MIDI_NOTE_TYPE:
+        status_byte += MIDI_NOTE_ON_STATUS
+    elif element.message_type() == MIDI_CC_TYPE:
+        status_byte += MIDI_CC_STATUS
+    else:
+        status_byte += MIDI_PB_STATUS
+    return (status_byte, element._original_identifier)
+
+class MIDIOutputScheduler(object):
+    ' Queues outgoing short messages by priority and sends at most a budget of them per tick '
+
+    # send_callback is called with each message as it goes out and its priority
+    def __init__(self, send_callback, messages_per_tick = MESSAGES_PER_TICK, max_meter_age = MAX_METER_AGE_TICKS):
+        assert (messages_per_tick > 0)
+        self._send_callback = send_callback
+        self._drop_callback = None
+        self._messages_per_tick = messages_per_tick
+        self._max_meter_age = max_meter_age
+        # One FIFO of (status, id) keys per priority, and the latest message and its tick for each queued key
+        self._queues = [ [] for index in range(NUM_PRIORITIES) ]
+        self._queued = {}
+        self._priorities = {}
+        self._tick = 0
+        self._sent_this_tick = 0
+        self.coalesced_sends = 0
+        self.dropped_sends = 0
+        self.deferred_sends = 0
+
+
+    def set_drop_callback(self, callback):
+        ' callback is called with each message dropped for being stale '
+        self._drop_callback = callback
+
+
+    def set_element_priority(self, element, priority):
+        assert (priority in range(NUM_PRIORITIES))
+        self._priorities[element_key(element)] = priority
+
+
+    def priority(self, midi_bytes):
+        return self._priorities.get((midi_bytes[0], midi_bytes[1]), FEEDBACK_PRIORITY)
+
+
+    def send(self, midi_bytes, priority = None):
+        """ Sends a short message now if the budget allows and nothing as urgent is waiting,
+            otherwise queues it in place of any older message to the same control """
+        assert (len(midi_bytes) == 3)
+        if priority == None:
+            priority = self.priority(midi_bytes)
+        key = (midi_bytes[0], midi_bytes[1])
+        if key in self._queued:
+            self._unqueue(key)
+            self.coalesced_sends += 1
+        elif (self._sent_this_tick < self._messages_per_tick) and (not self._is_waiting(priority)):
+            return self._send(midi_bytes, priority)
+        self._queues[priority].append(key)
+        self._queued[key] = (midi_bytes, self._tick, priority)
+        self.deferred_sends += 1
+        return True
+
+
+    def flush(self):
+        ' Called once per tick: drops stale meter frames and sends what the new budget allows '
+        self._tick += 1
+        self._sent_this_tick = 0
+        meter_queue = self._queues[METER_PRIORITY]
+        while (len(meter_queue) > 0) and ((self._tick - self._queued[meter_queue[0]][1]) > self._max_meter_age):
+            midi_bytes = self._queued[meter_queue[0]][0]
+            self._unqueue(meter_queue[0])
+            self.dropped_sends += 1
+            if self._drop_callback != None:
+                self._drop_callback(midi_bytes)
+        for queue in self._queues:
+            while (len(queue) > 0) and (self._sent_this_tick < self._messages_per_tick):
+                midi_bytes, tick, priority = self._queued[queue[0]]
+                self._unqueue(queue[0])
+                self._send(midi_bytes, priority)
+
+
+    def clear(self):
+        self._queues = [ [] for index in range(NUM_PRIORITIES) ]
+        self._queued = {}
+
+
+    def queued_sends(self):
+        return len(self._queued)
+
+
+    def _is_waiting(self, priority):
+        for index in range(priority + 1):
+            if len(self._queues[index]) > 0:
+                return True
+        return False
+
+
+    def _unqueue(self, key):
+        self._queues[self._queued[key][2]].remove(key)
+        del self._queued[key]
+
+
+    def _send(self, midi_bytes, priority):
+        self._sent_this_tick += 1
+        return self._send_callback(midi_bytes, priority)
@@ -0,0 +1,69 @@
+from __future__ import with_statement
+from _Framework.ButtonElement import ButtonElement
+
+# What a subscriber changes when the modifier goes down or up. Remapping subscribers are
+# dispatched first, so the LED updates that follow already see the new mapping
+MODIFIES_MAPPING = 1
+MODIFIES_LEDS = 2
+
+class ModifierBus(object):
+    """ The only listener on a modifier button (shift). Takes over the components' own
+        listeners and calls them once per press or release, in dispatch order. Edges arrive in
+        receive_midi, which already holds rebuild requests for the whole message """
+
+    def __init__(self, parent, button):
+        assert isinstance(button, ButtonElement)
+        self._parent = parent
+        self._button = button
+        self._subscribers = []
+        self._is_pressed = False
+        self._button.add_value_listener(self._button_value)
+
+
+    def disconnect(self):
+        ' Hands the listeners back to the button, so the components can remove them as usual '
+        self._button.remove_value_listener(self._button_value)
+        for callback, flags in self._subscribers:
+            self._button.add_value_listener(callback)
+        self._subscribers = []
+        self._button = None
+
+
+    def take_over(self, callback, flags):
+        """ callback is called with the button value on every edge instead of on every message.
+            The component must have added it to the button already """
+        assert self._button.value_has_listener(callback)
+        self._button.remove_value_listener(callback)
+        entry = (callback, flags)
+        if (flags & MODIFIES_MAPPING) != 0:
+            remappers = [ subscriber for subscriber in self._subscribers if (subscriber[1] & MODIFIES_MAPPING) != 0 ]
+            self._subscribers.insert(len(remappers), entry)
+        else:
+            self._subscribers.append(entry)
+
+
+    def is_pressed(self):
+        return self._is_pressed
+
+
+    def reset(self):
+        """ Called when the controller is (re)initialised. A release missed while Live was
+            out of focus would otherwise leave everything shifted until the next press """
+        if self._is_pressed:
+            self._is_pressed = False
+            # Outside receive_midi, so the release's remaps are batched here
+            with self._parent.rebuild_transaction():
+                self._dispatch(0)
+
+
+    def _button_value(self, value):
+        assert (value in range(128))
+        is_pressed = (value != 0)
+        if is_pressed != self._is_pressed:
+            self._is_pressed = is_pressed
+            self._dispatch(value)
+
+
+    def _dispatch(self, value):
+        for callback, flags in self._subscribers:
+            callback(value)
@@ -5,8 +5,8 @@ from _Framework.ButtonElement import ButtonElement
 class PedaledSessionComponent(APCSessionComponent):
     ' Special SessionComponent with a button (pedal) to fire the selected clip slot '
 
-    def __init__(self, num_tracks, num_scenes):
-        APCSessionComponent.__init__(self, num_tracks, num_scenes)
+    def __init__(self, parent, num_tracks, num_scenes):
+        APCSessionComponent.__init__(self, parent, num_tracks, num_scenes)
         self._slot_launch_button = None
 
 
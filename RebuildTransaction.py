@@ -0,0 +1,16 @@
+class RebuildTransaction(object):
+    """ Holds back MIDI map rebuild requests while it is open, so everything done inside it
+        costs at most one rebuild. Transactions nest; only the outermost one lets the rebuild go """
+
+    def __init__(self, surface):
+        self._surface = surface
+
+
+    def __enter__(self):
+        self._surface.set_suppress_rebuild_requests(True)
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._surface.set_suppress_rebuild_requests(False)
+        return False
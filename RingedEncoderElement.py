@@ -5,15 +5,38 @@ RING_OFF_VALUE = 0
 RING_SIN_VALUE = 1
 RING_VOL_VALUE = 2
 RING_PAN_VALUE = 3
+# Ticks between ring position updates from parameter changes. Changes in between are coalesced, last value wins
+RING_UPDATE_TICKS = 1
 class RingedEncoderElement(EncoderElement):
     ' Class representing a continuous control on the controller enclosed with an LED ring '
 
     def __init__(self, msg_type, channel, identifier, map_mode):
         EncoderElement.__init__(self, msg_type, channel, identifier, map_mode)
         self._ring_mode_button = None
+        self._scheduler = None
+        self._observed_parameter = None
+        # Ring mode of the mapped parameter only, so nothing holds on to deleted devices' parameters
+        self._ring_mode_parameter = None
+        self._ring_mode_value = RING_OFF_VALUE
+        self._ring_task = None
+        self._ring_value_pending = False
         self.set_needs_takeover(False)
 
 
+    def disconnect(self):
+        self._observe_parameter(None)
+        self._ring_mode_parameter = None
+        EncoderElement.disconnect(self)
+
+
+    def set_scheduler(self, scheduler):
+        ' Anything with schedule(delay_ticks, callback) and cancel(task), e.g. the script '
+        if self._scheduler != None:
+            self._scheduler.cancel(self._ring_task)
+            self._ring_task = None
+        self._scheduler = scheduler
+
+
     def set_ring_mode_button(self, button):
         assert ((button == None) or isinstance(button, ButtonElement))
         if (self._ring_mode_button != None):
@@ -32,6 +55,7 @@ class RingedEncoderElement(EncoderElement):
 
     def release_parameter(self):
         EncoderElement.release_parameter(self)
+        self._ring_mode_parameter = None
         self._update_ring_mode()
 
 
@@ -50,18 +74,60 @@ class RingedEncoderElement(EncoderElement):
         if (self._ring_mode_button != None):
             force_send = True
             if self.is_mapped_manually():
+                self._observe_parameter(None)
                 self._ring_mode_button.send_value(RING_SIN_VALUE, force_send)
             elif (self._parameter_to_map_to != None):
-                param = self._parameter_to_map_to
-                p_range = (param.max - param.min)
-                value = (((param.value - param.min) / p_range) * 127)
-                self.send_value(int(value), force_send)
-                if (self._parameter_to_map_to.min == (-1 * self._parameter_to_map_to.max)):
-                    self._ring_mode_button.send_value(RING_PAN_VALUE, force_send)
-                elif self._parameter_to_map_to.is_quantized:
-                    self._ring_mode_button.send_value(RING_SIN_VALUE, force_send)
-                else:
-                    self._ring_mode_button.send_value(RING_VOL_VALUE, force_send)
+                self._observe_parameter(self._parameter_to_map_to)
+                self.send_value(self._ring_value(self._parameter_to_map_to), force_send)
+                self._ring_mode_button.send_value(self._ring_mode(self._parameter_to_map_to), force_send)
             else:
+                self._observe_parameter(None)
                 self._ring_mode_button.send_value(RING_OFF_VALUE, force_send)
 
+
+    def _ring_value(self, param):
+        p_range = (param.max - param.min)
+        return int((((param.value - param.min) / p_range) * 127))
+
+
+    def _ring_mode(self, param):
+        if (param != self._ring_mode_parameter):
+            self._ring_mode_parameter = param
+            if (param.min == (-1 * param.max)):
+                self._ring_mode_value = RING_PAN_VALUE
+            elif param.is_quantized:
+                self._ring_mode_value = RING_SIN_VALUE
+            else:
+                self._ring_mode_value = RING_VOL_VALUE
+        return self._ring_mode_value
+
+
+    # Follows the mapped parameter, so automation and mouse edits reach the ring
+    def _observe_parameter(self, parameter):
+        if (parameter != self._observed_parameter):
+            if (self._observed_parameter != None):
+                self._observed_parameter.remove_value_listener(self._on_parameter_value_changed)
+            if ((self._scheduler != None) and (self._ring_task != None)):
+                self._scheduler.cancel(self._ring_task)
+            self._ring_task = None
+            self._ring_value_pending = False
+            self._observed_parameter = parameter
+            if (self._observed_parameter != None):
+                self._observed_parameter.add_value_listener(self._on_parameter_value_changed)
+
+
+    def _on_parameter_value_changed(self):
+        self._ring_value_pending = True
+        if (self._ring_task == None):
+            self._send_ring_value()
+
+
+    def _send_ring_value(self):
+        self._ring_task = None
+        if (self._ring_value_pending and (self._observed_parameter != None)):
+            self._ring_value_pending = False
+            force_send = True
+            self.send_value(self._ring_value(self._observed_parameter), force_send)
+            if (self._scheduler != None):
+                self._ring_task = self._scheduler.schedule(RING_UPDATE_TICKS, self._send_ring_value)
+
@@ -1,17 +1,26 @@
 
+from __future__ import with_statement
 import Live 
 from _Generic.Devices import * 
 from _Framework.DeviceComponent import DeviceComponent 
 from _Framework.ChannelTranslationSelector import ChannelTranslationSelector 
 from _Framework.ButtonElement import ButtonElement 
+from BankLayoutCache import BankLayoutCache
 class ShiftableDeviceComponent(DeviceComponent):
     ' DeviceComponent that only uses bank buttons if a shift button is pressed '
 
-    def __init__(self):
+    def __init__(self, parent):
         DeviceComponent.__init__(self)
+        self._parent = parent
         self._shift_button = None
         self._shift_pressed = False
         self._control_translation_selector = ChannelTranslationSelector(8)
+        # The device and bank the parameter controls were last assigned to, so a shift press
+        # that changes neither only repaints the buttons
+        self._assigned_device = None
+        self._assigned_bank_index = -1
+        self.avoided_remaps = 0
+        self._bank_layouts = BankLayoutCache(self._device_banks, self._device_bank_names)
 
 
     def disconnect(self):
@@ -29,8 +38,9 @@ class ShiftableDeviceComponent(DeviceComponent):
 
 
     def set_device(self, device):
-        DeviceComponent.set_device(self, device)
-        self._control_translation_selector.set_mode(self._bank_index)
+        with self._parent.rebuild_transaction():
+            DeviceComponent.set_device(self, device)
+            self._control_translation_selector.set_mode(self._bank_index)
 
 
     def set_shift_button(self, button):
@@ -45,16 +55,67 @@ class ShiftableDeviceComponent(DeviceComponent):
 
 
     def update(self):
+        self._assigned_device = None
+        self._assigned_bank_index = -1
         if (self._parameter_controls != None):
             for control in self._parameter_controls:
                 control.release_parameter()
         if (self.is_enabled() and (self._device != None)):
             self._device_bank_registry[self._device] = self._bank_index
-            if ((self._parameter_controls != None) and (self._bank_index < number_of_parameter_banks(self._device))):
+            layout = None
+            if self._uses_bank_layouts():
+                layout = self._bank_layouts.layout(self._device)
+            if ((self._parameter_controls != None) and (self._bank_index < self._number_of_banks(layout))):
                 old_bank_name = self._bank_name
-                self._assign_parameters()
+                self._assign_parameters(layout)
+                self._assigned_device = self._device
+                self._assigned_bank_index = self._bank_index
                 if (self._bank_name != old_bank_name):
                     self._show_msg_callback(((self._device.name + ' Bank: ') + self._bank_name))
+        self._update_shift_leds()
+
+
+    # Only built-in devices have fixed banks per class. Everything else, and the best-of-parameters
+    # bank used without bank buttons, is left to the framework
+    def _uses_bank_layouts(self):
+        return ((self._bank_buttons != None) and (self._device.class_name in self._device_banks))
+
+
+    # layout is the device's cached bank layout, or None for the framework's own
+    def _number_of_banks(self, layout = None):
+        if (layout != None):
+            return layout[0]
+        return number_of_parameter_banks(self._device, self._device_banks)
+
+
+    def _assign_parameters(self, layout = None):
+        if (layout == None):
+            DeviceComponent._assign_parameters(self)
+            return
+        assert self.is_enabled()
+        assert (self._device != None)
+        assert (self._parameter_controls != None)
+        num_banks, banks, bank_names = layout
+        self._bank_name = ('Bank ' + str((self._bank_index + 1)))
+        if (self._bank_index in range(len(bank_names))):
+            self._bank_name = bank_names[self._bank_index]
+        bank = ()
+        if (self._bank_index in range(len(banks))):
+            bank = banks[self._bank_index]
+        parameters = self._device.parameters
+        for index in range(len(self._parameter_controls)):
+            if ((index < len(bank)) and (bank[index] != -1)):
+                self._parameter_controls[index].connect_to(parameters[bank[index]])
+            else:
+                self._parameter_controls[index].release_parameter()
+
+
+    def _on_parameters_changed(self):
+        self._bank_layouts.forget(self._device)
+        DeviceComponent._on_parameters_changed(self)
+
+
+    def _update_shift_leds(self):
         if (not self._shift_pressed):
             self._on_on_off_changed()
         elif (self._bank_buttons != None):
@@ -69,7 +130,11 @@ class ShiftableDeviceComponent(DeviceComponent):
         assert (self._shift_button != None)
         assert (value in range(128))
         self._shift_pressed = (value != 0)
-        self.update()
+        if (self.is_enabled() and (self._device != None) and (self._device == self._assigned_device) and (self._bank_index == self._assigned_bank_index)):
+            self.avoided_remaps += 1
+            self._update_shift_leds()
+        else:
+            self.update()
 
 
     def _bank_value(self, value, sender):
@@ -78,8 +143,9 @@ class ShiftableDeviceComponent(DeviceComponent):
             if ((value != 0) or (not sender.is_momentary())):
                 self._bank_name = ''
                 self._bank_index = list(self._bank_buttons).index(sender)
-                self._control_translation_selector.set_mode(self._bank_index)
-                self.update()
+                with self._parent.rebuild_transaction():
+                    self._control_translation_selector.set_mode(self._bank_index)
+                    self.update()
 
 
     def _on_off_value(self, value):
@@ -0,0 +1,125 @@
+class SongModel(object):
+    """ Shared cache of the song's track and scene lists. Live builds a fresh tuple of proxies
+        on every read, so each list is read once and kept until its own listener fires """
+
+    def __init__(self, song):
+        self._song = song
+        self._tracks = None
+        self._visible_tracks = None
+        self._return_tracks = None
+        self._mixer_tracks = None
+        self._scenes = None
+        # name -> index, built on first lookup. Renames don't fire the list listeners, so hits are checked
+        self._track_names = None
+        self._scene_names = None
+        self.reads = 0
+        self._song.add_tracks_listener(self._on_tracks_changed)
+        self._song.add_visible_tracks_listener(self._on_visible_tracks_changed)
+        self._song.add_return_tracks_listener(self._on_return_tracks_changed)
+        self._song.add_scenes_listener(self._on_scenes_changed)
+
+
+    def disconnect(self):
+        self._song.remove_tracks_listener(self._on_tracks_changed)
+        self._song.remove_visible_tracks_listener(self._on_visible_tracks_changed)
+        self._song.remove_return_tracks_listener(self._on_return_tracks_changed)
+        self._song.remove_scenes_listener(self._on_scenes_changed)
+        self._song = None
+
+
+    def tracks(self):
+        if self._tracks == None:
+            self.reads += 1
+            self._tracks = self._song.tracks
+        return self._tracks
+
+
+    def visible_tracks(self):
+        if self._visible_tracks == None:
+            self.reads += 1
+            self._visible_tracks = self._song.visible_tracks
+        return self._visible_tracks
+
+
+    def return_tracks(self):
+        if self._return_tracks == None:
+            self.reads += 1
+            self._return_tracks = self._song.return_tracks
+        return self._return_tracks
+
+
+    def mixer_tracks(self):
+        ' The visible tracks followed by the returns, as the mixer and session lay them out '
+        if self._mixer_tracks == None:
+            self._mixer_tracks = (self.visible_tracks() + self.return_tracks())
+        return self._mixer_tracks
+
+
+    def scenes(self):
+        if self._scenes == None:
+            self.reads += 1
+            self._scenes = self._song.scenes
+        return self._scenes
+
+
+    def index_of_track(self, track):
+        ' Index into tracks() of the given track, or -1 once it has been deleted '
+        if track != None:
+            tracks = self.tracks()
+            for index in range(len(tracks)):
+                if tracks[index] == track:
+                    return index
+        return -1
+
+
+    def track_index(self, name):
+        ' Index into tracks() of the first track with the given name, or -1 '
+        index = self._name_index(self.tracks(), self._track_names, name)
+        if index == None:
+            self._track_names = self._build_names(self.tracks())
+            index = self._track_names.get(name, -1)
+        return index
+
+
+    def scene_index(self, name):
+        ' Index into scenes() of the first scene with the given name, or -1 '
+        index = self._name_index(self.scenes(), self._scene_names, name)
+        if index == None:
+            self._scene_names = self._build_names(self.scenes())
+            index = self._scene_names.get(name, -1)
+        return index
+
+
+    def _name_index(self, items, names, name):
+        if names != None:
+            index = names.get(name)
+            if (index != None) and (index < len(items)) and (items[index].name == name):
+                return index
+        return None
+
+
+    def _build_names(self, items):
+        names = {}
+        for index in range(len(items) - 1, -1, -1):
+            names[items[index].name] = index
+        return names
+
+
+    def _on_tracks_changed(self):
+        self._tracks = None
+        self._track_names = None
+
+
+    def _on_visible_tracks_changed(self):
+        self._visible_tracks = None
+        self._mixer_tracks = None
+
+
+    def _on_return_tracks_changed(self):
+        self._return_tracks = None
+        self._mixer_tracks = None
+
+
+    def _on_scenes_changed(self):
+        self._scenes = None
+        self._scene_names = None
@@ -5,30 +5,28 @@ TRACK_FOLD_DELAY = 5
 class SpecialChanStripComponent(ChannelStripComponent):
     ' Subclass of channel strip component using select button for (un)folding tracks '
 
-    def __init__(self):
+    def __init__(self, parent):
         ChannelStripComponent.__init__(self)
-        self._toggle_fold_ticks_delay = -1
-        self._register_timer_callback(self._on_timer)
+        self._parent = parent
+        self._toggle_fold_task = None
 
 
     def disconnect(self):
-        self._unregister_timer_callback(self._on_timer)
+        self._parent.cancel(self._toggle_fold_task)
+        self._toggle_fold_task = None
         ChannelStripComponent.disconnect(self)
 
 
     def _select_value(self, value):
         ChannelStripComponent._select_value(self, value)
         if (self.is_enabled() and (self._track != None)):
+            self._parent.cancel(self._toggle_fold_task)
+            self._toggle_fold_task = None
             if (self._track.is_foldable and (self._select_button.is_momentary() and (value != 0))):
-                self._toggle_fold_ticks_delay = TRACK_FOLD_DELAY
-            else:
-                self._toggle_fold_ticks_delay = -1
+                self._toggle_fold_task = self._parent.schedule(TRACK_FOLD_DELAY + 1, self._toggle_fold)
 
 
-    def _on_timer(self):
-        if (self.is_enabled() and (self._track != None)):
-            if (self._toggle_fold_ticks_delay > -1):
-                assert self._track.is_foldable
-                if (self._toggle_fold_ticks_delay == 0):
-                    self._track.fold_state = (not self._track.fold_state)
-                self._toggle_fold_ticks_delay -= 1
+    def _toggle_fold(self):
+        self._toggle_fold_task = None
+        if (self.is_enabled() and (self._track != None) and self._track.is_foldable):
+            self._track.fold_state = (not self._track.fold_state)
@@ -4,13 +4,15 @@ from SpecialChanStripComponent import SpecialChanStripComponent
 class SpecialMixerComponent(MixerComponent):
     ' Special mixer class that uses return tracks alongside midi and audio tracks '
 
-    def __init__(self, num_tracks):
+    def __init__(self, parent, num_tracks):
+        # The base class creates the strips, which need the parent for its scheduler
+        self._parent = parent
         MixerComponent.__init__(self, num_tracks)
 
 
     def tracks_to_use(self):
-        return (self.song().visible_tracks + self.song().return_tracks)
+        return self._parent.song_model().mixer_tracks()
 
 
     def _create_strip(self):
-        return SpecialChanStripComponent()
+        return SpecialChanStripComponent(self._parent)
@@ -2,7 +2,11 @@ import Live
 from _Framework.ControlSurfaceComponent import ControlSurfaceComponent
 from _Framework.ButtonElement import ButtonElement
 from _Framework.SessionComponent import SessionComponent 
+from LEDCompositor import VU_LAYER, CLIP_WARNING_LAYER
+from MIDIOutputScheduler import METER_PRIORITY
 import math
+from array import array
+from bisect import bisect_right
 
 
 # Constants. Tweaking these would let us work with different grid sizes or different templates
@@ -33,186 +37,423 @@ MASTER_SCALE_MAX = 0.92
 MASTER_SCALE_MIN = 0.52
 MASTER_SCALE_INCREMENTS = 5
 
-RMS_FRAMES = 2
-USE_RMS = True
-
-class VUMeter():
-  'represents a single VU to store RMS values etc in'
-  def __init__(self, parent, track, top, bottom, 
-              increments, vu_set, master = False):
-
-    self.frames = [0.0] * RMS_FRAMES
-    self.parent = parent
-    self.track = track
-    self.top = top
-    self.bottom = bottom
-    self.multiplier = self.calculate_multiplier(top, bottom, increments)
-    self.current_level = 0
-    self.matrix = self.setup_matrix(vu_set, master)
-    self.master = master
-
-  def observe(self):
-    new_frame = self.mean_peak() 
-    self.store_frame(new_frame)
-    if self.master and new_frame >= 0.92:
-      self.parent._clipping = True
-      self.parent.clip_warning()
-    else:
+# The clip warning latches on when the master peak reaches CLIP_ENTER_LEVEL, and only lets go once the
+# peak is below CLIP_EXIT_LEVEL and at least CLIP_HOLD_TICKS timer ticks have passed since it last clipped
+CLIP_ENTER_LEVEL = 0.92
+CLIP_EXIT_LEVEL = 0.88
+CLIP_HOLD_TICKS = 10
 
-      if self.master and self.parent._clipping:
-        self.parent._parent._session._change_offsets(0, 1) 
-        self.parent._parent._session._change_offsets(0, -1) 
+# Space the level thresholds evenly in dB between the scale's min and max instead of evenly in raw meter value
+USE_DB_CURVE = False
 
-
-        self.parent._clipping = False
-
-      if not self.parent._clipping:
-        if USE_RMS:
-          level = self.scale(self.rms(self.frames))
-        else:
-          level = self.scale(new_frame)
-        if level != self.current_level:
-          self.current_level = level
-          if self.master:
-            self.parent.set_master_leds(level)
-          else:
-            self.parent.set_leds(self.matrix, level) 
-
-  def store_frame(self, frame):
-    self.frames.pop(0)
-    self.frames.append(frame)
-
-  def rms(self, frames):
-    return math.sqrt(sum(frame*frame for frame in frames)/len(frames))
-
-  # return the mean of the L and R peak values
-  def mean_peak(self):
-    return (self.track.output_meter_left + self.track.output_meter_right) / 2
-
-
-  # Perform the scaling as per params. We reduce the range, then round it out to integers
-  def scale(self, value):
-    if (value > self.top):
-      value = self.top
-    elif (value < self.bottom):
-      value = self.bottom
-    value = value - self.bottom
-    value = value * self.multiplier #float, scale 0-10
-    return int(round(value))
-  
-  def calculate_multiplier(self, top, bottom, increments):
-    return (increments / (top - bottom))
-
-
-  # Goes from top to bottom: so clip grid, then stop, then select, then activator/solo/arm
-  def setup_matrix(self, vu_set, master):
-    matrix = []
-    if master:
-      for scene in self.parent._parent._session._scenes:
-        matrix.append(scene._launch_button)
+# RMS window lengths, in meter frames. At the default frame rate 3 frames is ~300ms, the classic VU integration time
+CHANNEL_RMS_FRAMES = 3
+MASTER_RMS_FRAMES = 3
+USE_RMS = True
+# The running sum of squares is recomputed from the window after this many full windows, so float error can't creep in
+RMS_REANCHOR_WINDOWS = 64
+
+# Meters are sampled from Live's timer rather than its meter listeners. Live fires the timer
+# about every 100ms, so 1 tick per frame gives ~10 meter frames a second
+FRAME_TICKS = 1
+
+# Ballistics, in levels per meter frame: how far the displayed level may rise or fall towards the measured one
+CHANNEL_ATTACK_LEVELS = 10
+CHANNEL_RELEASE_LEVELS = 1
+MASTER_ATTACK_LEVELS = 5
+MASTER_RELEASE_LEVELS = 1
+# A peak hold dot stays on the highest level reached for this many frames, then falls a level per frame. 0 turns it off
+PEAK_HOLD_FRAMES = 10
+
+# Meter bank mode: every column of the grid meters the track under it in the session ring, following
+# the session offset, instead of LEFT_SOURCE and RIGHT_SOURCE each spread over a pair of columns
+METER_BANK_MODE = False
+
+# Level n starts where the old clamp/scale/round arithmetic would have rounded up to n
+def calculate_thresholds(top, bottom, increments):
+  thresholds = []
+  for level in range(1, increments + 1):
+    if USE_DB_CURVE:
+      bottom_db = 20 * math.log10(bottom)
+      top_db = 20 * math.log10(top)
+      db = bottom_db + (((level - 0.5) * (top_db - bottom_db)) / increments)
+      thresholds.append(math.pow(10, db / 20))
+    else:
+      thresholds.append(bottom + (((level - 0.5) * (top - bottom)) / increments))
+  return thresholds
+
+# Velocities for every LED in a column, top first, indexed by level and then peak hold level.
+# Channel columns have the top LED red and the next one orange; the hold dot takes the colour of its LED
+def calculate_sprites(increments, master):
+  colours = []
+  for index in range(increments):
+    if master or index >= 2:
+      colours.append(LED_ON)
+    elif index == 0:
+      colours.append(LED_RED)
     else:
-      for index, column_index in enumerate(vu_set):
-        matrix.append([])
-        column = matrix[index]
-        for row_index in range(CLIP_GRID_Y):
-          column.append(self.parent._parent._button_rows[row_index][column_index])
-        if master != True:
-          strip = self.parent._parent._mixer.channel_strip(column_index)
-          column.append(self.parent._parent._track_stop_buttons[column_index])
-          column.extend([strip._select_button, strip._mute_button, strip._solo_button, strip._arm_button])
-    return matrix
+      colours.append(LED_ORANGE)
+  sprites = []
+  for level in range(increments + 1):
+    holds = []
+    for hold in range(increments + 1):
+      sprite = []
+      for index in range(increments):
+        if (index >= (increments - level)) or (index == (increments - hold)):
+          sprite.append(colours[index])
+        else:
+          sprite.append(LED_OFF)
+      holds.append(tuple(sprite))
+    sprites.append(tuple(holds))
+  return sprites
+
+
+class VUMeterBank(object):
+  'a bank of meters whose RMS windows and levels live in parallel arrays, updated in one pass'
+  def __init__(self, size, rms_frames, thresholds, attack = 1, release = 1, hold_frames = 0):
+    assert (rms_frames > 0)
+    assert ((attack > 0) and (release > 0) and (hold_frames >= 0))
+    self.size = size
+    self.rms_frames = rms_frames
+    self.attack = attack
+    self.release = release
+    self.hold_frames = hold_frames
+    # Lookup table: raw meter value -> level by bisecting the thresholds
+    self.thresholds = thresholds
+    # One circular buffer of squared frames per meter, laid end to end. All meters are sampled
+    # in the same pass, so they share a write position; the running sums make the RMS O(1)
+    self.frames = array('d', [0.0] * (size * rms_frames))
+    self.sums = array('d', [0.0] * size)
+    self.peaks = array('d', [0.0] * size)
+    # Displayed levels after ballistics, the peak hold dots and how many frames each dot has left
+    self.levels = array('i', [0] * size)
+    self.holds = array('i', [0] * size)
+    self.hold_counts = array('i', [0] * size)
+    self.frame_index = 0
+    self.frames_until_reanchor = rms_frames * RMS_REANCHOR_WINDOWS
+
+  # Sample every track (None meters silence) and return the indices of meters whose level or hold dot moved.
+  # Ballistics are applied per frame, so a column changes at most once per frame however fast the meters do
+  def update(self, tracks):
+    assert (len(tracks) == self.size)
+    frames = self.frames
+    sums = self.sums
+    peaks = self.peaks
+    levels = self.levels
+    holds = self.holds
+    hold_counts = self.hold_counts
+    thresholds = self.thresholds
+    rms_frames = self.rms_frames
+    slot = self.frame_index
+    changed = []
+    for index in range(self.size):
+      track = tracks[index]
+      peak = 0.0
+      if track != None:
+        # the mean of the L and R peak values
+        peak = (track.output_meter_left + track.output_meter_right) / 2
+      peaks[index] = peak
+      square = peak * peak
+      sums[index] += square - frames[slot]
+      frames[slot] = square
+      if USE_RMS:
+        # Subtracting old squares can leave a tiny negative sum behind once the window goes silent
+        target = bisect_right(thresholds, math.sqrt(max(sums[index], 0.0) / rms_frames))
+      else:
+        target = bisect_right(thresholds, peak)
+      old_level = levels[index]
+      if target > old_level:
+        level = min(target, old_level + self.attack)
+      else:
+        level = max(target, old_level - self.release)
+      old_hold = holds[index]
+      if (level >= old_hold) or (self.hold_frames == 0):
+        hold = level
+        hold_counts[index] = self.hold_frames
+      elif hold_counts[index] > 0:
+        hold = old_hold
+        hold_counts[index] -= 1
+      else:
+        hold = old_hold - 1
+      if (level != old_level) or (hold != old_hold):
+        levels[index] = level
+        holds[index] = hold
+        changed.append(index)
+      slot += rms_frames
+    self.frame_index += 1
+    if self.frame_index == rms_frames:
+      self.frame_index = 0
+    self.frames_until_reanchor -= 1
+    if self.frames_until_reanchor == 0:
+      self.reanchor()
+    return changed
+
+  # Recompute the running sums from the windows, so float error can't build up
+  def reanchor(self):
+    self.frames_until_reanchor = self.rms_frames * RMS_REANCHOR_WINDOWS
+    for index in range(self.size):
+      start = index * self.rms_frames
+      self.sums[index] = sum(self.frames[start:start + self.rms_frames])
+
+  # Forget a meter's history, e.g. when it starts metering a different track. The displayed level
+  # falls away through the release, and the next update always reports the meter as changed
+  def reset(self, index):
+    start = index * self.rms_frames
+    for slot in range(start, start + self.rms_frames):
+      self.frames[slot] = 0.0
+    self.sums[index] = 0.0
+    self.peaks[index] = 0.0
+    self.holds[index] = -1
+    self.hold_counts[index] = 0
+
+  # Move meters to new indices along with their tracks, e.g. when the session ring scrolls, so a track
+  # keeps its window, level and hold dot. moves[index] is the meter's old index, or -1 for one that
+  # starts afresh. Returns the indices whose level or hold dot is now different from before
+  def move(self, moves):
+    assert (len(moves) == self.size)
+    rms_frames = self.rms_frames
+    frames = self.frames[:]
+    sums = self.sums[:]
+    peaks = self.peaks[:]
+    levels = self.levels[:]
+    holds = self.holds[:]
+    hold_counts = self.hold_counts[:]
+    changed = []
+    for index in range(self.size):
+      old_index = moves[index]
+      if old_index < 0:
+        self.reset(index)
+      elif old_index != index:
+        start = index * rms_frames
+        old_start = old_index * rms_frames
+        self.frames[start:start + rms_frames] = frames[old_start:old_start + rms_frames]
+        self.sums[index] = sums[old_index]
+        self.peaks[index] = peaks[old_index]
+        self.hold_counts[index] = hold_counts[old_index]
+        if (levels[old_index] != levels[index]) or (holds[old_index] != holds[index]):
+          self.levels[index] = levels[old_index]
+          self.holds[index] = holds[old_index]
+          changed.append(index)
+    return changed
 
 
 class VUMeters(ControlSurfaceComponent):
     'standalone class used to handle VU meters'
 
-    def __init__(self, parent):
+    def __init__(self, parent, frame_ticks = FRAME_TICKS):
         # Boilerplate
         ControlSurfaceComponent.__init__(self)
         self._parent = parent
-
-        # Default the L/R/Master levels to 0
-        self._meter_level = 0
-        self._left_level = 0
-        self._right_level = 0
+        assert (frame_ticks > 0)
+        self._frame_ticks = frame_ticks
+        self._frame_task = None
 
         # We don't start clipping
         self._clipping = False
+        self._clip_hold_ticks = 0
+
+        # The meters and the clip warning are overlays on the script's LED compositor
+        self._compositor = parent._compositor
+        self._session = parent._session
+
+        # Lookup tables: level -> velocities for a whole column
+        self._channel_sprites = calculate_sprites(CHANNEL_SCALE_INCREMENTS, False)
+        self._master_sprites = calculate_sprites(MASTER_SCALE_INCREMENTS, True)
+
+        # Each meter draws on a set of columns: a pair per source track, or one per track in meter bank mode
+        if METER_BANK_MODE:
+          column_sets = [ [column_index] for column_index in range(CLIP_GRID_X) ]
+          self._session.add_offset_listener(self._on_session_offset_changed)
+        else:
+          column_sets = [LEFT_COLUMN_VUS, RIGHT_COLUMN_VUS]
+        self._matrices = [ [ self.setup_column(column_index) for column_index in column_set ] for column_set in column_sets ]
+        self._master_buttons = [ scene._launch_button for scene in self._session._scenes ]
+
+        # The tracks we'll be pulling L and R RMS from, and their names for finding them again
+        self._sources = None
+        self._source_names = None
+        # Set when the session ring moves; the sources follow it once per frame, however many steps it took
+        self._sources_dirty = False
+        # Meters that moved to a column showing something else, drawn with the next frame
+        self._moved_meters = {}
+        self._sources = self.channel_sources()
+        self._source_names = self.source_names(self._sources)
+        self._master_sources = (self.song().master_track,)
+        self._channel_bank = VUMeterBank(len(self._sources), CHANNEL_RMS_FRAMES,
+                                         calculate_thresholds(CHANNEL_SCALE_MAX, CHANNEL_SCALE_MIN, CHANNEL_SCALE_INCREMENTS),
+                                         CHANNEL_ATTACK_LEVELS, CHANNEL_RELEASE_LEVELS, PEAK_HOLD_FRAMES)
+        self._master_bank = VUMeterBank(1, MASTER_RMS_FRAMES,
+                                        calculate_thresholds(MASTER_SCALE_MAX, MASTER_SCALE_MIN, MASTER_SCALE_INCREMENTS),
+                                        MASTER_ATTACK_LEVELS, MASTER_RELEASE_LEVELS, PEAK_HOLD_FRAMES)
+        self._frame_task = parent.schedule(frame_ticks, self._on_frame)
 
-        # The tracks we'll be pulling L and R RMS from
-        self._left_track = self.song().tracks[LEFT_SOURCE]
-        self._right_track = self.song().tracks[RIGHT_SOURCE]
-        
-        #setup classes
-        self.left_meter = VUMeter(self, self._left_track, 
-                                  CHANNEL_SCALE_MAX, 
-                                  CHANNEL_SCALE_MIN, CHANNEL_SCALE_INCREMENTS,
-                                  LEFT_COLUMN_VUS)
-        self.right_meter = VUMeter(self, self._right_track, 
-                                  CHANNEL_SCALE_MAX, 
-                                  CHANNEL_SCALE_MIN, CHANNEL_SCALE_INCREMENTS,
-                                  RIGHT_COLUMN_VUS)
-        self.master_meter = VUMeter(self, self.song().master_track,
-                                    MASTER_SCALE_MAX,
-                                    MASTER_SCALE_MIN, MASTER_SCALE_INCREMENTS,
-                                    None, True)
-        # Listeners!
-        self._left_track.add_output_meter_left_listener(self.left_meter.observe)
-        self._right_track.add_output_meter_left_listener(self.right_meter.observe)
-        self.song().master_track.add_output_meter_left_listener(self.master_meter.observe)
-
-    # If you fail to kill the listeners on shutdown, Ableton stores them in memory and punches you in the face
     def disconnect(self):
-        self._left_track.remove_output_meter_left_listener(self.left_meter.observe)
-        self._right_track.remove_output_meter_left_listener(self.right_meter.observe)
-        self.song().master_track.remove_output_meter_left_listener(self.master_meter.observe)
+        self._parent.cancel(self._frame_task)
+        self._frame_task = None
+        if METER_BANK_MODE:
+          self._session.remove_offset_listener(self._on_session_offset_changed)
+
+    # Goes from top to bottom: so clip grid, then stop, then select, then activator/solo/arm
+    def setup_column(self, column_index):
+        column = [ self._parent._button_rows[row_index][column_index] for row_index in range(CLIP_GRID_Y) ]
+        strip = self._parent._mixer.channel_strip(column_index)
+        column.append(self._parent._track_stop_buttons[column_index])
+        column.extend([strip._select_button, strip._mute_button, strip._solo_button, strip._arm_button])
+        return column
+
+    def channel_sources(self):
+        if METER_BANK_MODE:
+          tracks = self._session.tracks_to_use()
+          track_offset = self._session.track_offset()
+          sources = []
+          for column_index in range(CLIP_GRID_X):
+            if (track_offset + column_index) < len(tracks):
+              sources.append(tracks[track_offset + column_index])
+            else:
+              sources.append(None)
+          return tuple(sources)
+        return (self.resolve_source(0, LEFT_SOURCE), self.resolve_source(1, RIGHT_SOURCE))
+
+    # A fixed source starts out as the track at its index, then follows that track wherever it is
+    # moved. If it is deleted, a track of the same name takes over (e.g. undoing the delete),
+    # otherwise the meter goes dark
+    def resolve_source(self, index, default_index):
+        model = self._parent.song_model()
+        tracks = model.tracks()
+        if self._sources == None:
+          track_index = default_index
+        else:
+          track_index = model.index_of_track(self._sources[index])
+          if (track_index < 0) and (self._source_names[index] != None):
+            track_index = model.track_index(self._source_names[index])
+        if (track_index >= 0) and (track_index < len(tracks)):
+          return tracks[track_index]
+        return None
+
+    # A dark meter keeps the name of the track it lost, so it can pick it up again
+    def source_names(self, sources):
+      names = []
+      for index in range(len(sources)):
+        if sources[index] != None:
+          names.append(sources[index].name)
+        elif self._source_names != None:
+          names.append(self._source_names[index])
+        else:
+          names.append(None)
+      return tuple(names)
+
+    # Swaps the whole set of sources in one go, before the next frame samples them. A track that is
+    # still metered takes its meter along to its new column; only tracks new to the set start afresh
+    def set_sources(self, sources):
+        moves = []
+        for index in range(len(sources)):
+          old_index = -1
+          if sources[index] != None:
+            for candidate in range(len(self._sources)):
+              if self._sources[candidate] == sources[index]:
+                old_index = candidate
+                break
+          moves.append(old_index)
+        for index in self._channel_bank.move(moves):
+          self._moved_meters[index] = True
+        self._source_names = self.source_names(sources)
+        self._sources = sources
+
+    # In meter bank mode the columns follow the session ring
+    def _on_session_offset_changed(self):
+        self._sources_dirty = True
+
+    # One pass over all meters per frame, however often Live updates the meter values themselves
+    def _on_frame(self):
+        self._frame_task = self._parent.schedule(self._frame_ticks, self._on_frame)
+        self._clip_hold_ticks = max(self._clip_hold_ticks - self._frame_ticks, 0)
+        if self._sources_dirty:
+          self._sources_dirty = False
+          self.set_sources(self.channel_sources())
+        if self.is_enabled():
+          self.observe()
+
+    # Meter frames go out behind everything else and may be dropped if they get stale
+    def observe(self):
+        self._parent._send_priority = METER_PRIORITY
+        try:
+          self._compositor.redraw_forgotten()
+          self.render()
+        finally:
+          self._parent._send_priority = None
+
+    # Sample and draw the master first, so a clip warning is up before the channel meters draw
+    # underneath it; they keep drawing there so they are current when it goes away
+    def render(self):
+        master_bank = self._master_bank
+        if master_bank.update(self._master_sources):
+          self.set_master_leds(self._master_sprites[master_bank.levels[0]][master_bank.holds[0]])
+        self.update_clip_state(master_bank.peaks[0])
+        levels = self._channel_bank.levels
+        holds = self._channel_bank.holds
+        changed = self._channel_bank.update(self._sources)
+        if len(self._moved_meters) > 0:
+          for index in changed:
+            self._moved_meters[index] = True
+          changed = self._moved_meters.keys()
+          self._moved_meters = {}
+        for index in changed:
+          self.set_leds(self._matrices[index], self._channel_sprites[levels[index]][holds[index]])
+
+    # Latches the clip warning with hysteresis, so the grid is painted once when the master
+    # starts clipping and restored once when it stops, however long it hovers around the threshold
+    def update_clip_state(self, peak):
+      if peak >= CLIP_ENTER_LEVEL:
+        self._clip_hold_ticks = CLIP_HOLD_TICKS
+        if not self._clipping:
+          self._clipping = True
+          self.clip_warning()
+      elif self._clipping and (peak < CLIP_EXIT_LEVEL) and (self._clip_hold_ticks == 0):
+        self._clipping = False
+        self.end_clip_warning()
 
     # Called when the Master clips. Makes the entire clip grid BRIGHT RED 
     def clip_warning(self):
       for row_index in range(CLIP_GRID_Y):
         row = self._parent._button_rows[row_index]
         for button_index in range(CLIP_GRID_X):
-          button = row[button_index]
-          # Passing True to send_value forces it to happen even when the button in question is MIDI mapped
-          button.send_value(LED_RED, True)
+          self._compositor.set_value(CLIP_WARNING_LAYER, row[button_index], LED_RED)
+
+    # Lifting the warning re-sends only the covered pads, from the meters or the session underneath
+    def end_clip_warning(self):
+      self._compositor.clear(CLIP_WARNING_LAYER)
 
-    def set_master_leds(self, level):
+    def set_master_leds(self, sprite):
         for scene_index in range(CLIP_GRID_Y):
-            scene = self._parent._session.scene(scene_index)
-            if scene_index >= (CLIP_GRID_Y - level):
-              scene._launch_button.send_value(LED_ON, True)
-            else:
-              scene._launch_button.send_value(LED_OFF, True)
+            self._compositor.set_value(VU_LAYER, self._master_buttons[scene_index], sprite[scene_index])
 
 
-    # Iterate through every column in the matrix, light up the LEDs based on the level
-    # Level for channels is scaled to 10 cos we have 10 LEDs
-    # Top two LEDs are red, the next is orange
-    def set_leds(self, matrix, level):
+    # Draw the same column sprite (see calculate_sprites) on every column in the matrix
+    def set_leds(self, matrix, sprite):
         for column in matrix:
-          for index in range(10):
-            button = column[index] 
-            if index >= (10 - level): 
-              if index < 1:
-                button.send_value(LED_RED, True)
-              elif index < 2:
-                button.send_value(LED_ORANGE, True)
-              else:
-                button.send_value(LED_ON, True)
-            else:
-              button.send_value(LED_OFF, True)
+          for index in range(len(sprite)):
+            self._compositor.set_value(VU_LAYER, column[index], sprite[index])
+
+    # Number of LED messages skipped because the pad already showed that velocity
+    def suppressed_sends(self):
+        return self._compositor.suppressed_sends()
 
     # boilerplate
     def update(self):
         pass
 
+    # The controller comes back blank after the handshake, so redraw the overlays
     def on_enabled_changed(self):
+        if self.is_enabled():
+          self._compositor.refresh()
         self.update()
 
     def on_selected_track_changed(self):
         self.update()
 
+    # Inserted, moved and deleted tracks; nothing to restart, the sources are just resolved again
     def on_track_list_changed(self):
+        self.set_sources(self.channel_sources())
         self.update()
 
     def on_selected_scene_changed(self):
@@ -0,0 +1,207 @@
+""" Behaviour checks for the APC40 script against the headless rig. Run with the Python 2 that matches Live's:
+
+    python bench/check_scenarios.py [check ...]
+
+Most checks drive the script through a scenario and then compare what the controller shows with a
+cold redraw: everything a fresh script instance on the same song sends, with no caches to go by.
+Anything an incremental path forgot to send, or sent stale, shows up as a difference. Exits with 1
+if any check fails """
+import sys
+from optparse import OptionParser
+
+from headless import HeadlessRig, NOTE_ON_STATUS
+import Live
+import run_benchmarks
+
+SHIFT_ID = 98
+BANK_UP_ID = 94
+BANK_DOWN_ID = 95
+# Velocity of the clip warning, and the ids of the clip grid's notes (one channel per column)
+LED_RED = 3
+CLIP_GRID_IDS = range(53, 58)
+# Enough frames for every meter to fall to zero and every peak hold dot to drop
+SETTLE_TICKS = 40
+
+
+def make_rig(num_tracks = 16, num_scenes = 40):
+    rig = HeadlessRig(num_tracks, num_scenes)
+    rig.handshake()
+    rig.tick(10)
+    return rig
+
+
+def silence(rig):
+    ' Drives every meter and then stops them, so the VU columns come to rest and can be compared '
+    tracks = list(rig.song.tracks) + [rig.song.master_track]
+    # A meter that has never drawn leaves its columns to the mixer, one that has shows them off at rest
+    for track in tracks:
+        track.set_meters(0.8, 0.8)
+    rig.tick(5)
+    for track in tracks:
+        track.set_meters(0.0, 0.0)
+    rig.tick(SETTLE_TICKS)
+
+
+def assert_matches_cold_redraw(rig):
+    ' Replaces the script with a fresh one on the same song, with the ring where it was, and compares the LEDs '
+    silence(rig)
+    shown = dict(rig.c_instance.leds)
+    session = rig.script._session
+    offsets = (session.track_offset(), session.scene_offset())
+    rig.disconnect()
+    cold = HeadlessRig(song = rig.song)
+    cold.handshake()
+    cold.script._session.set_offsets(offsets[0], offsets[1])
+    silence(cold)
+    redrawn = cold.c_instance.leds
+    keys = dict(shown)
+    keys.update(redrawn)
+    differences = [ (key, shown.get(key, 0), redrawn.get(key, 0)) for key in keys.keys() if shown.get(key, 0) != redrawn.get(key, 0) ]
+    differences.sort()
+    cold.disconnect()
+    assert len(differences) == 0, 'LEDs differ from a cold redraw as (status, id), shown, redrawn: ' + str(differences[:8])
+
+
+def check_benchmark_scenarios():
+    ' After every benchmark scenario, the controller shows what a cold redraw would '
+    for name, setup in run_benchmarks.SCENARIOS:
+        rig = run_benchmarks.make_rig()
+        event = setup(rig)
+        # Whole cycles of the toggling and cycling scenarios, so the modes end where a fresh script starts
+        for index in range(24):
+            event()
+        # And no buttons held
+        rig.release(NOTE_ON_STATUS, SHIFT_ID)
+        rig.release(NOTE_ON_STATUS, run_benchmarks.BANK_RIGHT_ID)
+        rig.release(NOTE_ON_STATUS, run_benchmarks.BANK_LEFT_ID)
+        try:
+            assert_matches_cold_redraw(rig)
+        except AssertionError, error:
+            raise AssertionError, name + ': ' + str(error)
+
+
+def check_clip_warning_restore():
+    ' The clip warning turns the grid red and lifting it restores the clips underneath '
+    rig = make_rig()
+    for track in rig.song.tracks:
+        track.clip_slots[1].set_clip(Live.Clip.Clip())
+    rig.song.tracks[4].clip_slots[2].set_clip(Live.Clip.Clip())
+    rig.song.tracks[4].clip_slots[2].clip.set_state(is_playing = True)
+    silence(rig)
+    rig.song.master_track.set_meters(1.0, 1.0)
+    rig.tick(3)
+    leds = rig.c_instance.leds
+    for column in range(8):
+        for identifier in CLIP_GRID_IDS:
+            assert leds.get((NOTE_ON_STATUS + column, identifier)) == LED_RED, 'clip warning missing on ' + str((column, identifier))
+    assert_matches_cold_redraw(rig)
+
+
+def check_vu_sources_follow_tracks():
+    ' The meter sources stay on their tracks when tracks are inserted and deleted '
+    rig = make_rig()
+    meters = _vu_meters(rig)
+    left, right = meters._sources
+    rig.song.insert_track(0, 'Inserted')
+    rig.tick()
+    assert meters._sources == (left, right), 'meters did not follow their tracks'
+    rig.song.delete_track(list(rig.song.tracks).index(left))
+    rig.tick()
+    assert (meters._sources[0] == None) and (meters._sources[1] == right), 'deleted source not dropped'
+    rig.song.insert_track(2, left.name)
+    rig.tick()
+    assert meters._sources[0] == rig.song.tracks[2], 'recreated track not picked up by name'
+    assert_matches_cold_redraw(rig)
+
+
+def check_bank_acceleration():
+    ' A held bank button repeats faster and faster, with at most one ring move per tick, clamped at the end '
+    rig = make_rig(num_scenes = 500)
+    session = rig.script._session
+    moves = []
+    session.add_offset_listener(lambda : moves.append(session.scene_offset()))
+    rig.press(NOTE_ON_STATUS, BANK_DOWN_ID)
+    assert session.scene_offset() == 1, 'first step was not immediate'
+    offsets = [session.scene_offset()]
+    for index in range(30):
+        rig.tick()
+        offsets.append(session.scene_offset())
+    steps = [ offsets[index + 1] - offsets[index] for index in range(len(offsets) - 1) ]
+    assert len(moves) <= 31, 'more than one ring move per tick'
+    assert steps[0] == 0, 'repeated before the delay'
+    assert max(steps) > 1, 'never accelerated'
+    for index in range(len(steps) - 1):
+        assert steps[index + 1] >= steps[index], 'slowed down while held'
+    rig.tick(200)
+    assert session.scene_offset() == 499, 'not clamped to the last scene'
+    rig.release(NOTE_ON_STATUS, BANK_DOWN_ID)
+    rig.tick(2)
+    moves_after_release = len(moves)
+    rig.tick(5)
+    assert len(moves) == moves_after_release, 'kept moving after release'
+    assert_matches_cold_redraw(rig)
+
+
+def check_scroll_cache_invalidation():
+    ' Clips that change while out of the ring show their new state when scrolled back in '
+    rig = make_rig()
+    session = rig.script._session
+    slot = rig.song.tracks[1].clip_slots[1]
+    slot.set_clip(Live.Clip.Clip())
+    rig.tick()
+    session.set_offsets(0, 10)
+    rig.tick()
+    slot.clip.set_state(is_playing = True)
+    rig.song.tracks[2].clip_slots[0].set_clip(Live.Clip.Clip())
+    session.set_offsets(0, 0)
+    rig.tick()
+    assert rig.c_instance.leds.get((NOTE_ON_STATUS + 1, CLIP_GRID_IDS[1])) == 1, 'playing clip not shown after scrolling back'
+    # And one that changes while in view
+    rig.song.tracks[3].clip_slots[2].set_clip(Live.Clip.Clip())
+    rig.tick()
+    rig.song.tracks[3].clip_slots[2].clip.set_state(is_triggered = True)
+    rig.tick()
+    assert rig.c_instance.leds.get((NOTE_ON_STATUS + 3, CLIP_GRID_IDS[2])) == 2, 'triggered clip not shown'
+    # One step at a time, so the cached rows are reused
+    for index in range(3):
+        rig.tap(BANK_DOWN_ID)
+        rig.tick(2)
+    slot.clip.set_state()
+    rig.tap(BANK_UP_ID)
+    rig.tick(2)
+    rig.song.insert_track(0, 'Inserted')
+    rig.tick()
+    assert_matches_cold_redraw(rig)
+
+
+def _vu_meters(rig):
+    for component in rig.script.components:
+        if component.__class__.__name__ == 'VUMeters':
+            return component
+    raise KeyError('VUMeters')
+
+
+CHECKS = (('benchmark_scenarios', check_benchmark_scenarios),
+          ('clip_warning_restore', check_clip_warning_restore),
+          ('vu_sources_follow_tracks', check_vu_sources_follow_tracks),
+          ('bank_acceleration', check_bank_acceleration),
+          ('scroll_cache_invalidation', check_scroll_cache_invalidation))
+
+
+def main(argv):
+    parser = OptionParser(usage = '%prog [check ...]')
+    options, names = parser.parse_args(argv)
+    failures = 0
+    for name, check in CHECKS:
+        if (len(names) == 0) or (name in names):
+            try:
+                check()
+                print '%-28s ok' % name
+            except AssertionError, error:
+                failures += 1
+                print '%-28s FAILED: %s' % (name, error)
+    return int(failures > 0)
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,450 @@
+""" Headless stand-in for Live's Python API.
+
+Models the parts of the Live 8 object model the APC40 script touches: a song
+with tracks, return tracks, scenes and clip slots, devices with parameters, the
+song and application views, and the add_/remove_/..._has_listener protocol.
+Meter values, clip states and the track list are plain attributes that a
+benchmark can script; setting them through the setters notifies listeners the
+way Live does.
+"""
+import types
+
+
+class _Listenable(object):
+    ' Base class providing add_x_listener / remove_x_listener / x_has_listener '
+
+    __listeners__ = ()
+
+    def __init__(self):
+        object.__setattr__(self, '_listeners', {})
+        for name in self.__listeners__:
+            self._listeners[name] = []
+
+    def __getattr__(self, attr):
+        for prefix, handler in (('add_', self._add_listener), ('remove_', self._remove_listener)):
+            if attr.startswith(prefix) and attr.endswith('_listener'):
+                name = attr[len(prefix):-len('_listener')]
+                if name in self.__listeners__:
+                    return lambda callback: handler(name, callback)
+        if attr.endswith('_has_listener'):
+            name = attr[:-len('_has_listener')]
+            if name in self.__listeners__:
+                return lambda callback: callback in self._listeners[name]
+        raise AttributeError(attr)
+
+    def _add_listener(self, name, callback):
+        if callback in self._listeners[name]:
+            raise RuntimeError('Listener already connected')
+        self._listeners[name].append(callback)
+
+    def _remove_listener(self, name, callback):
+        if callback not in self._listeners[name]:
+            raise RuntimeError('Listener not connected')
+        self._listeners[name].remove(callback)
+
+    def listener_count(self, name = None):
+        if name != None:
+            return len(self._listeners[name])
+        return sum([ len(callbacks) for callbacks in self._listeners.values() ])
+
+    def notify(self, name):
+        for callback in list(self._listeners[name]):
+            callback()
+
+    def _set_and_notify(self, name, value):
+        if getattr(self, '_' + name) != value:
+            object.__setattr__(self, '_' + name, value)
+            self.notify(name)
+
+
+def _notifying(name):
+    return property(lambda self: getattr(self, '_' + name), lambda self, value: self._set_and_notify(name, value))
+
+
+class _DeviceParameter(_Listenable):
+    __listeners__ = ('value',)
+    value = _notifying('value')
+
+    def __init__(self, name, value = 0.0, min = 0.0, max = 1.0, is_quantized = False):
+        _Listenable.__init__(self)
+        self.name = name
+        self._value = value
+        self.min = min
+        self.max = max
+        self.is_quantized = is_quantized
+        self.is_enabled = True
+
+
+class _Device(_Listenable):
+    __listeners__ = ('parameters', 'name')
+    name = _notifying('name')
+
+    def __init__(self, name, class_name, num_parameters = 8):
+        _Listenable.__init__(self)
+        self._name = name
+        self.class_name = class_name
+        self.parameters = tuple([_DeviceParameter('Device On', 1.0, 0.0, 1.0, True)] + [ _DeviceParameter('Parameter ' + str(index + 1)) for index in range(num_parameters) ])
+
+    def set_parameters(self, parameters):
+        self.parameters = tuple(parameters)
+        self.notify('parameters')
+
+
+class _MixerDevice(_Listenable):
+    __listeners__ = ('sends',)
+
+    def __init__(self, num_sends):
+        _Listenable.__init__(self)
+        self.volume = _DeviceParameter('Track Volume', 0.85)
+        self.panning = _DeviceParameter('Track Panning', 0.0, -1.0, 1.0)
+        self.sends = tuple([ _DeviceParameter('Send ' + chr(65 + index)) for index in range(num_sends) ])
+        self.crossfader = _DeviceParameter('Crossfade', 0.0, -1.0, 1.0)
+        self.cue_volume = _DeviceParameter('Cue Volume', 0.85)
+
+
+class _Clip(_Listenable):
+    __listeners__ = ('playing_status', 'name', 'color')
+
+    def __init__(self, name = 'Clip'):
+        _Listenable.__init__(self)
+        self.name = name
+        self.color = 0
+        self.is_playing = False
+        self.is_triggered = False
+        self.is_recording = False
+        self.will_record_on_start = False
+
+    def set_state(self, is_playing = False, is_triggered = False, is_recording = False):
+        self.is_playing = is_playing
+        self.is_triggered = is_triggered
+        self.is_recording = is_recording
+        self.notify('playing_status')
+
+
+class _ClipSlot(_Listenable):
+    __listeners__ = ('has_clip', 'is_triggered', 'playing_status', 'has_stop_button')
+
+    def __init__(self, track):
+        _Listenable.__init__(self)
+        self.canonical_parent = track
+        self.clip = None
+        self.is_triggered = False
+        self.will_record_on_start = False
+        self.has_stop_button = True
+        self.is_playing = False
+        self.fire_count = 0
+
+    def _get_has_clip(self):
+        return self.clip != None
+
+    has_clip = property(_get_has_clip)
+
+    def set_clip(self, clip):
+        self.clip = clip
+        self.notify('has_clip')
+
+    def fire(self):
+        self.fire_count += 1
+        if self.clip != None:
+            self.clip.set_state(is_triggered = True)
+        else:
+            self.is_triggered = True
+            self.notify('is_triggered')
+
+    def stop(self):
+        if self.clip != None:
+            self.clip.set_state()
+
+
+class _TrackView(_Listenable):
+    __listeners__ = ('selected_device',)
+
+    def __init__(self, track):
+        _Listenable.__init__(self)
+        self._track = track
+        self.selected_device = None
+
+
+class _Track(_Listenable):
+    __listeners__ = ('name', 'output_meter_left', 'output_meter_right', 'devices', 'playing_slot_index', 'fired_slot_index', 'arm', 'solo', 'mute', 'fold_state', 'color', 'current_monitoring_state')
+    name = _notifying('name')
+    output_meter_left = _notifying('output_meter_left')
+    output_meter_right = _notifying('output_meter_right')
+    arm = _notifying('arm')
+    solo = _notifying('solo')
+    mute = _notifying('mute')
+    fold_state = _notifying('fold_state')
+    playing_slot_index = _notifying('playing_slot_index')
+
+    def __init__(self, name, num_scenes = 0, num_sends = 0, is_foldable = False):
+        _Listenable.__init__(self)
+        self._name = name
+        self._output_meter_left = 0.0
+        self._output_meter_right = 0.0
+        self._arm = False
+        self._solo = False
+        self._mute = False
+        self._fold_state = False
+        self._playing_slot_index = -1
+        self.fired_slot_index = -1
+        self.is_foldable = is_foldable
+        self.can_be_armed = not is_foldable
+        self.color = 0
+        self.clip_slots = tuple([ _ClipSlot(self) for index in range(num_scenes) ])
+        self.devices = ()
+        self.mixer_device = _MixerDevice(num_sends)
+        self.view = _TrackView(self)
+
+    def set_meters(self, left, right):
+        self.output_meter_right = right
+        self.output_meter_left = left
+
+    def set_devices(self, devices):
+        self.devices = tuple(devices)
+        if len(self.devices) > 0:
+            self.view.selected_device = self.devices[0]
+        self.notify('devices')
+
+
+class _Scene(_Listenable):
+    __listeners__ = ('name', 'is_triggered', 'color')
+
+    def __init__(self, song, name):
+        _Listenable.__init__(self)
+        self._song = song
+        self.name = name
+        self.is_triggered = False
+        self.fire_count = 0
+
+    def _get_clip_slots(self):
+        index = list(self._song.scenes).index(self)
+        return tuple([ track.clip_slots[index] for track in self._song.tracks ])
+
+    clip_slots = property(_get_clip_slots)
+
+    def fire(self):
+        self.fire_count += 1
+
+
+class _SongView(_Listenable):
+    __listeners__ = ('selected_track', 'selected_scene', 'detail_clip')
+    selected_track = _notifying('selected_track')
+    selected_scene = _notifying('selected_scene')
+
+    def __init__(self, song):
+        _Listenable.__init__(self)
+        self._song = song
+        self._selected_track = None
+        self._selected_scene = None
+
+    def _get_highlighted_clip_slot(self):
+        track = self._selected_track
+        scene = self._selected_scene
+        if (track == None) or (scene == None) or (track not in self._song.tracks):
+            return None
+        return track.clip_slots[list(self._song.scenes).index(scene)]
+
+    highlighted_clip_slot = property(_get_highlighted_clip_slot)
+
+    def select_device(self, device):
+        if self._selected_track != None:
+            self._selected_track.view.selected_device = device
+
+
+class _Song(_Listenable):
+    __listeners__ = ('tracks', 'visible_tracks', 'return_tracks', 'scenes', 'midi_recording_quantization', 'metronome', 'overdub', 'is_playing', 'record_mode', 'tempo')
+    midi_recording_quantization = _notifying('midi_recording_quantization')
+    metronome = _notifying('metronome')
+    overdub = _notifying('overdub')
+    is_playing = _notifying('is_playing')
+    record_mode = _notifying('record_mode')
+
+    def __init__(self, num_tracks = 8, num_scenes = 5, num_returns = 2):
+        _Listenable.__init__(self)
+        self._midi_recording_quantization = _RecordingQuantization.rec_q_sixtenth
+        self._metronome = False
+        self._overdub = False
+        self._is_playing = False
+        self._record_mode = False
+        self.tempo = 120.0
+        self.nudge_up = False
+        self.nudge_down = False
+        self.scenes = tuple([ _Scene(self, 'Scene ' + str(index + 1)) for index in range(num_scenes) ])
+        self.tracks = tuple([ _Track('Track ' + str(index + 1), num_scenes, num_returns) for index in range(num_tracks) ])
+        self.return_tracks = tuple([ _Track(chr(65 + index) + '-Return', 0, num_returns) for index in range(num_returns) ])
+        self.master_track = _Track('Master', 0, 0)
+        self.view = _SongView(self)
+        if len(self.tracks) > 0:
+            self.view._selected_track = self.tracks[0]
+        if len(self.scenes) > 0:
+            self.view._selected_scene = self.scenes[0]
+        self.tuple_reads = 0
+
+    def _get_visible_tracks(self):
+        self.tuple_reads += 1
+        return self.tracks
+
+    visible_tracks = property(_get_visible_tracks)
+
+    def _num_returns(self):
+        return len(self.return_tracks)
+
+    def insert_track(self, index, name):
+        track = _Track(name, len(self.scenes), self._num_returns())
+        tracks = list(self.tracks)
+        tracks.insert(index, track)
+        self.tracks = tuple(tracks)
+        self.notify('tracks')
+        self.notify('visible_tracks')
+        return track
+
+    def delete_track(self, index):
+        tracks = list(self.tracks)
+        track = tracks.pop(index)
+        self.tracks = tuple(tracks)
+        if self.view._selected_track == track:
+            self.view._selected_track = self.tracks[0]
+        self.notify('tracks')
+        self.notify('visible_tracks')
+
+    def create_scene(self, index):
+        scenes = list(self.scenes)
+        scene = _Scene(self, 'Scene')
+        scenes.insert(index, scene)
+        for track in self.tracks:
+            slots = list(track.clip_slots)
+            slots.insert(index, _ClipSlot(track))
+            track.clip_slots = tuple(slots)
+        self.scenes = tuple(scenes)
+        self.notify('scenes')
+        return scene
+
+    def stop_all_clips(self):
+        for track in self.tracks:
+            for slot in track.clip_slots:
+                slot.stop()
+
+    def tap_tempo(self):
+        pass
+
+    def continue_playing(self):
+        self.is_playing = True
+
+    def start_playing(self):
+        self.is_playing = True
+
+    def stop_playing(self):
+        self.is_playing = False
+
+
+class _ApplicationView(_Listenable):
+    __listeners__ = ()
+
+    def __init__(self):
+        _Listenable.__init__(self)
+        self._visible = {'Detail': False, 'Detail/DeviceChain': True, 'Detail/Clip': False}
+        self._visibility_listeners = {}
+
+    def is_view_visible(self, name):
+        return self._visible.get(name, False)
+
+    def _set_visible(self, name, visible):
+        if self._visible.get(name, False) != visible:
+            self._visible[name] = visible
+            for callback in list(self._visibility_listeners.get(name, [])):
+                callback()
+
+    def show_view(self, name):
+        self._set_visible(name, True)
+        if name == 'Detail/Clip':
+            self._set_visible('Detail/DeviceChain', False)
+        elif name == 'Detail/DeviceChain':
+            self._set_visible('Detail/Clip', False)
+
+    def hide_view(self, name):
+        self._set_visible(name, False)
+
+    def focus_view(self, name):
+        self.show_view(name)
+
+    def scroll_view(self, direction, name, modifier_pressed):
+        pass
+
+    def add_is_view_visible_listener(self, name, callback):
+        self._visibility_listeners.setdefault(name, []).append(callback)
+
+    def remove_is_view_visible_listener(self, name, callback):
+        self._visibility_listeners[name].remove(callback)
+
+
+class _NavDirection(object):
+    up = 0
+    down = 1
+    left = 2
+    right = 3
+
+
+class _View(object):
+    NavDirection = _NavDirection
+
+
+class _Application(object):
+    View = _View
+
+    def __init__(self):
+        self.view = _ApplicationView()
+
+    def get_major_version(self):
+        return 8
+
+    def get_minor_version(self):
+        return 2
+
+    def get_bugfix_version(self):
+        return 2
+
+
+class _RecordingQuantization(object):
+    rec_q_no_q = 0
+    rec_q_quarter = 1
+    rec_q_eight = 2
+    rec_q_eight_triplet = 3
+    rec_q_eight_eight_triplet = 4
+    rec_q_sixtenth = 5
+
+
+class _MapMode(object):
+    absolute = 0
+    absolute_14_bit = 1
+    relative_signed_bit = 2
+    relative_binary_offset = 3
+    relative_signed_bit2 = 4
+    relative_two_compliment = 5
+
+
+def _module(name, **attributes):
+    module = types.ModuleType(name)
+    module.__dict__.update(attributes)
+    return module
+
+
+_application = _Application()
+
+
+def _get_random_int(lower, upper):
+    return (lower + upper) / 2
+
+
+def _encrypt_challenge(challenge1, challenge2):
+    return (((challenge1 * 7) + 13) & 4294967295L, (challenge2 ^ 1515870810) & 4294967295L)
+
+
+Application = _module('Live.Application', Application = _Application, get_application = lambda : _application, combine_apcs = lambda : False, get_random_int = _get_random_int, encrypt_challenge = _encrypt_challenge)
+Song = _module('Live.Song', Song = _Song, RecordingQuantization = _RecordingQuantization)
+Track = _module('Live.Track', Track = _Track)
+Scene = _module('Live.Scene', Scene = _Scene)
+Clip = _module('Live.Clip', Clip = _Clip)
+ClipSlot = _module('Live.ClipSlot', ClipSlot = _ClipSlot)
+Device = _module('Live.Device', Device = _Device)
+DeviceParameter = _module('Live.DeviceParameter', DeviceParameter = _DeviceParameter)
+MidiMap = _module('Live.MidiMap', MapMode = _MapMode)
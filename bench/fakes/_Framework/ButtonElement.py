@@ -0,0 +1,19 @@
+from InputControlElement import *
+
+
+class ButtonElement(InputControlElement):
+    ' Class representing a button on the controller '
+
+    def __init__(self, is_momentary, msg_type, channel, identifier):
+        assert (msg_type != MIDI_PB_TYPE)
+        InputControlElement.__init__(self, msg_type, channel, identifier)
+        self._is_momentary = is_momentary
+
+    def is_momentary(self):
+        return self._is_momentary
+
+    def turn_on(self):
+        self.send_value(127)
+
+    def turn_off(self):
+        self.send_value(0)
@@ -0,0 +1,47 @@
+from ControlElement import ControlElement
+
+
+class ButtonMatrixElement(ControlElement):
+    ' Class representing a 2-dimensional set of buttons '
+
+    def __init__(self):
+        ControlElement.__init__(self)
+        self._buttons = []
+        self._value_notifications = {}
+
+    def add_row(self, buttons):
+        self._buttons.append(buttons)
+
+    def width(self):
+        if len(self._buttons) == 0:
+            return 0
+        return len(self._buttons[0])
+
+    def height(self):
+        return len(self._buttons)
+
+    def send_value(self, column, row, value, force_send = False):
+        self._buttons[row][column].send_value(value, force_send)
+
+    def get_button(self, column, row):
+        return self._buttons[row][column]
+
+    def add_value_listener(self, callback):
+        assert (callback not in self._value_notifications)
+        forwarders = []
+        for y, row in enumerate(self._buttons):
+            for x, button in enumerate(row):
+                forwarder = self._make_forwarder(callback, x, y, button)
+                button.add_value_listener(forwarder)
+                forwarders.append((button, forwarder))
+        self._value_notifications[callback] = forwarders
+
+    def remove_value_listener(self, callback):
+        for button, forwarder in self._value_notifications.pop(callback):
+            button.remove_value_listener(forwarder)
+
+    def value_has_listener(self, callback):
+        return callback in self._value_notifications
+
+    def _make_forwarder(self, callback, x, y, button):
+        return lambda value: callback(value, x, y, button.is_momentary())
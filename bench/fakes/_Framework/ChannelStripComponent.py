@@ -0,0 +1,169 @@
+import Live
+from ControlSurfaceComponent import ControlSurfaceComponent
+from ButtonElement import ButtonElement
+from EncoderElement import EncoderElement
+
+
+class ChannelStripComponent(ControlSurfaceComponent):
+    ' Class attaching to the mixer of a given track '
+
+    def __init__(self):
+        ControlSurfaceComponent.__init__(self)
+        self._track = None
+        self._send_controls = []
+        self._pan_control = None
+        self._volume_control = None
+        self._select_button = None
+        self._mute_button = None
+        self._solo_button = None
+        self._arm_button = None
+        self._shift_button = None
+        self._shift_pressed = False
+        self._invert_mute_feedback = False
+
+    def disconnect(self):
+        self.set_track(None)
+        for name in ('_select_button', '_mute_button', '_solo_button', '_arm_button', '_shift_button'):
+            button = getattr(self, name)
+            if button != None:
+                button.remove_value_listener(getattr(self, name[:-len('_button')] + '_value'))
+                setattr(self, name, None)
+
+    def set_track(self, track):
+        if self._track != None:
+            self._track.remove_mute_listener(self._on_mute_changed)
+            self._track.remove_solo_listener(self._on_solo_changed)
+            if self._track.can_be_armed:
+                self._track.remove_arm_listener(self._on_arm_changed)
+        self._track = track
+        if self._track != None:
+            self._track.add_mute_listener(self._on_mute_changed)
+            self._track.add_solo_listener(self._on_solo_changed)
+            if self._track.can_be_armed:
+                self._track.add_arm_listener(self._on_arm_changed)
+        self.update()
+
+    def _set_button(self, name, button, callback):
+        assert ((button == None) or isinstance(button, ButtonElement))
+        old_button = getattr(self, name)
+        if old_button != button:
+            if old_button != None:
+                old_button.remove_value_listener(callback)
+            setattr(self, name, button)
+            if button != None:
+                button.add_value_listener(callback)
+            self.update()
+
+    def set_select_button(self, button):
+        self._set_button('_select_button', button, self._select_value)
+
+    def set_mute_button(self, button):
+        self._set_button('_mute_button', button, self._mute_value)
+
+    def set_solo_button(self, button):
+        self._set_button('_solo_button', button, self._solo_value)
+
+    def set_arm_button(self, button):
+        self._set_button('_arm_button', button, self._arm_value)
+
+    def set_shift_button(self, button):
+        self._set_button('_shift_button', button, self._shift_value)
+
+    def set_invert_mute_feedback(self, invert_feedback):
+        if self._invert_mute_feedback != invert_feedback:
+            self._invert_mute_feedback = invert_feedback
+            self.update()
+
+    def set_volume_control(self, control):
+        if control != self._volume_control:
+            if self._volume_control != None:
+                self._volume_control.release_parameter()
+            self._volume_control = control
+            self.update()
+
+    def set_pan_control(self, control):
+        if control != self._pan_control:
+            if self._pan_control != None:
+                self._pan_control.release_parameter()
+            self._pan_control = control
+            self.update()
+
+    def set_send_controls(self, controls):
+        if controls != self._send_controls:
+            for control in self._send_controls:
+                if control != None:
+                    control.release_parameter()
+            self._send_controls = controls
+            self.update()
+
+    def on_enabled_changed(self):
+        self.update()
+
+    def update(self):
+        if self._allow_updates:
+            if self.is_enabled() and (self._track != None):
+                mixer = self._track.mixer_device
+                if self._volume_control != None:
+                    self._volume_control.connect_to(mixer.volume)
+                if self._pan_control != None:
+                    self._pan_control.connect_to(mixer.panning)
+                for index in range(len(self._send_controls)):
+                    control = self._send_controls[index]
+                    if control != None:
+                        if index < len(mixer.sends):
+                            control.connect_to(mixer.sends[index])
+                        else:
+                            control.release_parameter()
+                self._on_mute_changed()
+                self._on_solo_changed()
+                self._on_arm_changed()
+            else:
+                for control in [self._volume_control, self._pan_control] + list(self._send_controls):
+                    if control != None:
+                        control.release_parameter()
+        else:
+            self._update_requests += 1
+
+    def _select_value(self, value):
+        assert (self._select_button != None)
+        if self.is_enabled() and (self._track != None):
+            if (value != 0) or (not self._select_button.is_momentary()):
+                if self.song().view.selected_track != self._track:
+                    self.song().view.selected_track = self._track
+
+    def _mute_value(self, value):
+        if self.is_enabled() and (self._track != None) and (value != 0):
+            self._track.mute = not self._track.mute
+
+    def _solo_value(self, value):
+        if self.is_enabled() and (self._track != None) and (value != 0):
+            self._track.solo = not self._track.solo
+
+    def _arm_value(self, value):
+        if self.is_enabled() and (self._track != None) and self._track.can_be_armed and (value != 0):
+            self._track.arm = not self._track.arm
+
+    def _shift_value(self, value):
+        assert (self._shift_button != None)
+        self._shift_pressed = (value != 0)
+
+    def _on_mute_changed(self):
+        if self.is_enabled() and (self._mute_button != None):
+            if (self._track != None) and (self._track.mute != self._invert_mute_feedback):
+                self._mute_button.turn_on()
+            else:
+                self._mute_button.turn_off()
+
+    def _on_solo_changed(self):
+        if self.is_enabled() and (self._solo_button != None):
+            if (self._track != None) and self._track.solo:
+                self._solo_button.turn_on()
+            else:
+                self._solo_button.turn_off()
+
+    def _on_arm_changed(self):
+        if self.is_enabled() and (self._arm_button != None):
+            if (self._track != None) and self._track.can_be_armed and self._track.arm:
+                self._arm_button.turn_on()
+            else:
+                self._arm_button.turn_off()
@@ -0,0 +1,36 @@
+from ModeSelectorComponent import ModeSelectorComponent
+from InputControlElement import InputControlElement
+
+
+class ChannelTranslationSelector(ModeSelectorComponent):
+    ' Class switches modes by translating the given controls\' message channel '
+
+    def __init__(self, num_modes = 0):
+        ModeSelectorComponent.__init__(self)
+        self._controls_to_translate = None
+        self._initial_num_modes = num_modes
+
+    def disconnect(self):
+        ModeSelectorComponent.disconnect(self)
+        for button in self._modes_buttons:
+            button.remove_value_listener(self._mode_value)
+        self._modes_buttons = []
+        self._controls_to_translate = None
+
+    def set_controls_to_translate(self, controls):
+        assert isinstance(controls, tuple)
+        assert (self._controls_to_translate == None)
+        self._controls_to_translate = controls
+
+    def number_of_modes(self):
+        result = self._initial_num_modes
+        if (result == 0) and (len(self._modes_buttons) > 0):
+            result = len(self._modes_buttons)
+        return result
+
+    def update(self):
+        if self.is_enabled():
+            if self._controls_to_translate != None:
+                for control in self._controls_to_translate:
+                    control.use_default_message()
+                    control.set_channel((control.message_channel() + self._mode_index) % 16)
@@ -0,0 +1,127 @@
+import Live
+from ControlSurfaceComponent import ControlSurfaceComponent
+from ButtonElement import ButtonElement
+
+
+class ClipSlotComponent(ControlSurfaceComponent):
+    ' Component representing a ClipSlot within Live '
+
+    def __init__(self):
+        ControlSurfaceComponent.__init__(self)
+        self._clip_slot = None
+        self._launch_button = None
+        self._triggered_to_play_value = 126
+        self._triggered_to_record_value = 121
+        self._started_value = 127
+        self._recording_value = 120
+        self._stopped_value = 0
+        self._has_fired_slot = False
+        self._observed_clip = None
+
+    def disconnect(self):
+        self.set_clip_slot(None)
+        if self._launch_button != None:
+            self._launch_button.remove_value_listener(self._launch_value)
+            self._launch_button = None
+
+    def on_enabled_changed(self):
+        self.update()
+
+    def set_clip_slot(self, clip_slot):
+        if clip_slot != self._clip_slot:
+            if self._clip_slot != None:
+                self._clip_slot.remove_has_clip_listener(self._on_clip_state_changed)
+                self._clip_slot.remove_is_triggered_listener(self._on_slot_triggered_changed)
+            self._observe_clip(None)
+            self._clip_slot = clip_slot
+            if self._clip_slot != None:
+                self._clip_slot.add_has_clip_listener(self._on_clip_state_changed)
+                self._clip_slot.add_is_triggered_listener(self._on_slot_triggered_changed)
+                self._observe_clip(self._clip_slot.clip)
+            self.update()
+
+    def set_launch_button(self, button):
+        assert ((button == None) or isinstance(button, ButtonElement))
+        if button != self._launch_button:
+            if self._launch_button != None:
+                self._launch_button.remove_value_listener(self._launch_value)
+            self._launch_button = button
+            if self._launch_button != None:
+                self._launch_button.add_value_listener(self._launch_value)
+            self.update()
+
+    def set_triggered_to_play_value(self, value):
+        self._triggered_to_play_value = value
+
+    def set_triggered_to_record_value(self, value):
+        self._triggered_to_record_value = value
+
+    def set_started_value(self, value):
+        self._started_value = value
+
+    def set_recording_value(self, value):
+        self._recording_value = value
+
+    def set_stopped_value(self, value):
+        self._stopped_value = value
+
+    def has_clip(self):
+        assert (self._clip_slot != None)
+        return self._clip_slot.has_clip
+
+    def update(self):
+        self._has_fired_slot = False
+        if self._allow_updates:
+            if self.is_enabled() and (self._launch_button != None):
+                value_to_send = -1
+                if self._clip_slot != None:
+                    if self.has_clip():
+                        value_to_send = self._stopped_value
+                        if self._clip_slot.clip.is_triggered:
+                            if self._clip_slot.clip.will_record_on_start:
+                                value_to_send = self._triggered_to_record_value
+                            else:
+                                value_to_send = self._triggered_to_play_value
+                        elif self._clip_slot.clip.is_playing:
+                            if self._clip_slot.clip.is_recording:
+                                value_to_send = self._recording_value
+                            else:
+                                value_to_send = self._started_value
+                    elif self._clip_slot.is_triggered:
+                        if self._clip_slot.will_record_on_start:
+                            value_to_send = self._triggered_to_record_value
+                        else:
+                            value_to_send = self._triggered_to_play_value
+                if value_to_send in range(128):
+                    self._launch_button.send_value(value_to_send)
+                else:
+                    self._launch_button.turn_off()
+        else:
+            self._update_requests += 1
+
+    def _on_clip_state_changed(self):
+        assert (self._clip_slot != None)
+        self._observe_clip(self._clip_slot.clip)
+        self.update()
+
+    def _observe_clip(self, clip):
+        if clip != self._observed_clip:
+            if self._observed_clip != None:
+                self._observed_clip.remove_playing_status_listener(self._on_clip_playing_state_changed)
+            self._observed_clip = clip
+            if clip != None:
+                clip.add_playing_status_listener(self._on_clip_playing_state_changed)
+
+    def _on_clip_playing_state_changed(self):
+        self.update()
+
+    def _on_slot_triggered_changed(self):
+        if not self._has_fired_slot:
+            self.update()
+
+    def _launch_value(self, value):
+        assert (self._launch_button != None)
+        if self.is_enabled() and (self._clip_slot != None):
+            if (value != 0) or (not self._launch_button.is_momentary()):
+                self._has_fired_slot = True
+                self._clip_slot.fire()
@@ -0,0 +1,24 @@
+from ControlSurfaceComponent import ControlSurfaceComponent
+
+
+class CompoundComponent(ControlSurfaceComponent):
+    ' Base class for classes encompasing other components to form complex components '
+
+    def __init__(self):
+        ControlSurfaceComponent.__init__(self)
+        self._sub_components = []
+
+    def disconnect(self):
+        # Sub components register with the surface too, which disconnects each of them itself
+        self._sub_components = []
+
+    def register_components(self, *components):
+        for component in components:
+            assert (component not in self._sub_components)
+            component.set_enabled(self.is_enabled())
+            self._sub_components.append(component)
+
+    def set_enabled(self, enable):
+        ControlSurfaceComponent.set_enabled(self, enable)
+        for component in self._sub_components:
+            component.set_enabled(enable)
@@ -0,0 +1,21 @@
+class ControlElement(object):
+    ' Base class for all elements on the controller '
+
+    _register_control = None
+
+    def set_register_control_callback(callback):
+        ControlElement._register_control = callback
+
+    set_register_control_callback = staticmethod(set_register_control_callback)
+
+    def __init__(self):
+        object.__init__(self)
+        self.name = ''
+        if ControlElement._register_control != None:
+            ControlElement._register_control(self)
+
+    def disconnect(self):
+        pass
+
+    def install_connections(self):
+        pass
@@ -0,0 +1,201 @@
+import Live
+from ControlSurfaceComponent import ControlSurfaceComponent
+from ControlElement import ControlElement
+from InputControlElement import *
+
+
+class ControlSurface(object):
+    ' Central base class for scripts based on the new Framework '
+
+    def __init__(self, c_instance):
+        object.__init__(self)
+        self._c_instance = c_instance
+        self._suggested_input_port = ''
+        self._suggested_output_port = ''
+        self._components = []
+        self.controls = []
+        self._device_component = None
+        self._forwarding_registry = {}
+        self._translation_registry = {}
+        self._mapping_registry = {}
+        self._scheduled_messages = []
+        self._timer_callbacks = []
+        self._rebuild_requests_during_suppression = 0
+        self._suppress_requests_counter = 0
+        self._device_selection_follows_track_selection = False
+        ControlElement.set_register_control_callback(self._register_control)
+        InputControlElement.set_surface_callbacks(self._install_mapping, self._install_forwarding, self._install_translation, self._send_midi, self.request_rebuild_midi_map)
+        ControlSurfaceComponent.set_surface_callbacks(self._register_component, self._register_timer_callback, self._unregister_timer_callback, self.request_rebuild_midi_map, self.song(), self.application())
+        self.song().add_visible_tracks_listener(self._on_track_list_changed)
+        self.song().add_scenes_listener(self._on_scene_list_changed)
+        self.song().view.add_selected_track_listener(self._on_selected_track_changed)
+        self.song().view.add_selected_scene_listener(self._on_selected_scene_changed)
+
+    def _get_components(self):
+        return self._components
+
+    components = property(_get_components)
+
+    def disconnect(self):
+        self.song().remove_visible_tracks_listener(self._on_track_list_changed)
+        self.song().remove_scenes_listener(self._on_scene_list_changed)
+        self.song().view.remove_selected_track_listener(self._on_selected_track_changed)
+        self.song().view.remove_selected_scene_listener(self._on_selected_scene_changed)
+        for component in self._components:
+            component.disconnect()
+        self._components = []
+        for control in self.controls:
+            control.disconnect()
+        self.controls = []
+        self._timer_callbacks = []
+        self._scheduled_messages = []
+
+    def application(self):
+        return Live.Application.get_application()
+
+    def song(self):
+        return self._c_instance.song()
+
+    def suggest_input_port(self):
+        return self._suggested_input_port
+
+    def suggest_output_port(self):
+        return self._suggested_output_port
+
+    def log_message(self, message):
+        self._c_instance.log_message(message)
+
+    def show_message(self, message):
+        self._c_instance.show_message(message)
+
+    def set_device_component(self, device_component):
+        self._device_component = device_component
+        device_component._show_msg_callback = self.show_message
+
+    def refresh_state(self):
+        for component in self._components:
+            component.update()
+
+    def update_display(self):
+        ' Live calls this every 100ms '
+        scheduled_messages = self._scheduled_messages
+        self._scheduled_messages = []
+        for entry in scheduled_messages:
+            entry[0] -= 1
+            if entry[0] <= 0:
+                if entry[2] != None:
+                    entry[1](entry[2])
+                else:
+                    entry[1]()
+            else:
+                self._scheduled_messages.append(entry)
+        for callback in list(self._timer_callbacks):
+            callback()
+
+    def schedule_message(self, delay_in_ticks, callback, parameter = None):
+        assert (delay_in_ticks > 0)
+        self._scheduled_messages.append([delay_in_ticks, callback, parameter])
+
+    def request_rebuild_midi_map(self):
+        if self._suppress_requests_counter > 0:
+            self._rebuild_requests_during_suppression += 1
+        else:
+            self._c_instance.request_rebuild_midi_map()
+
+    def set_suppress_rebuild_requests(self, suppress_requests):
+        assert isinstance(suppress_requests, type(False))
+        if suppress_requests:
+            self._suppress_requests_counter += 1
+        else:
+            assert (self._suppress_requests_counter > 0)
+            self._suppress_requests_counter -= 1
+            if (self._suppress_requests_counter == 0) and (self._rebuild_requests_during_suppression > 0):
+                self.request_rebuild_midi_map()
+                self._rebuild_requests_during_suppression = 0
+
+    def build_midi_map(self, midi_map_handle):
+        self._forwarding_registry = {}
+        self._translation_registry = {}
+        self._mapping_registry = {}
+        for control in self.controls:
+            control.install_connections()
+
+    def receive_midi(self, midi_bytes):
+        assert (midi_bytes != None)
+        assert isinstance(midi_bytes, tuple)
+        self.set_suppress_rebuild_requests(True)
+        if len(midi_bytes) == 3:
+            status = midi_bytes[0]
+            if (status & 240) == MIDI_NOTE_OFF_STATUS:
+                status = MIDI_NOTE_ON_STATUS + (status & 15)
+                midi_bytes = (status, midi_bytes[1], 0)
+            key = self._translation_registry.get((status, midi_bytes[1]), (status, midi_bytes[1]))
+            if key in self._mapping_registry:
+                parameter = self._mapping_registry[key]
+                parameter.value = parameter.min + ((parameter.max - parameter.min) * midi_bytes[2] / 127.0)
+            elif key in self._forwarding_registry:
+                self._forwarding_registry[key].receive_value(midi_bytes[2])
+        else:
+            self.handle_sysex(midi_bytes)
+        self.set_suppress_rebuild_requests(False)
+
+    def handle_sysex(self, midi_bytes):
+        pass
+
+    def _send_midi(self, midi_bytes):
+        self._c_instance.send_midi(midi_bytes)
+        return True
+
+    def _register_control(self, control):
+        self.controls.append(control)
+
+    def _register_component(self, component):
+        self._components.append(component)
+
+    def _register_timer_callback(self, callback):
+        assert (callback not in self._timer_callbacks)
+        self._timer_callbacks.append(callback)
+
+    def _unregister_timer_callback(self, callback):
+        assert (callback in self._timer_callbacks)
+        self._timer_callbacks.remove(callback)
+
+    def _status_key(self, control):
+        return (control._status_byte() - control._original_channel + control.message_channel(), control.message_identifier())
+
+    def _install_mapping(self, control, parameter, feedback_delay):
+        self._mapping_registry[self._status_key(control)] = parameter
+        return True
+
+    def _install_forwarding(self, control):
+        self._forwarding_registry[self._status_key(control)] = control
+        return True
+
+    def _install_translation(self, msg_type, from_identifier, from_channel, to_identifier, to_channel):
+        status = MIDI_CC_STATUS
+        if msg_type == MIDI_NOTE_TYPE:
+            status = MIDI_NOTE_ON_STATUS
+        self._translation_registry[(status + from_channel, from_identifier)] = (status + to_channel, to_identifier)
+
+    def _set_session_highlight(self, track_offset, scene_offset, width, height, include_return_tracks):
+        self._c_instance.set_session_highlight(track_offset, scene_offset, width, height, include_return_tracks)
+
+    def _on_track_list_changed(self):
+        for component in self._components:
+            component.on_track_list_changed()
+
+    def _on_scene_list_changed(self):
+        for component in self._components:
+            component.on_scene_list_changed()
+
+    def _on_selected_track_changed(self):
+        for component in self._components:
+            component.on_selected_track_changed()
+        if self._device_selection_follows_track_selection and (self._device_component != None):
+            track = self.song().view.selected_track
+            if track != None:
+                self._device_component.set_device(track.view.selected_device)
+
+    def _on_selected_scene_changed(self):
+        for component in self._components:
+            component.on_selected_scene_changed()
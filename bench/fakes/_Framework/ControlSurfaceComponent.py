@@ -0,0 +1,87 @@
+import Live
+
+
+class ControlSurfaceComponent(object):
+    ' Base class for all classes encapsulating functions in Live '
+
+    _register_component = None
+    _register_timer_callback_func = None
+    _unregister_timer_callback_func = None
+    _request_rebuild_func = None
+    _song = None
+    _application = None
+
+    def set_surface_callbacks(register_component, register_timer, unregister_timer, request_rebuild, song, application):
+        ControlSurfaceComponent._register_component = register_component
+        ControlSurfaceComponent._register_timer_callback_func = register_timer
+        ControlSurfaceComponent._unregister_timer_callback_func = unregister_timer
+        ControlSurfaceComponent._request_rebuild_func = request_rebuild
+        ControlSurfaceComponent._song = song
+        ControlSurfaceComponent._application = application
+
+    set_surface_callbacks = staticmethod(set_surface_callbacks)
+
+    def __init__(self):
+        object.__init__(self)
+        self.name = ''
+        self._is_enabled = True
+        self._allow_updates = True
+        self._update_requests = 0
+        self._song_instance = ControlSurfaceComponent._song
+        self._application_instance = ControlSurfaceComponent._application
+        self._register_timer = ControlSurfaceComponent._register_timer_callback_func
+        self._unregister_timer = ControlSurfaceComponent._unregister_timer_callback_func
+        self._request_rebuild = ControlSurfaceComponent._request_rebuild_func
+        ControlSurfaceComponent._register_component(self)
+
+    def disconnect(self):
+        pass
+
+    def song(self):
+        return self._song_instance
+
+    def application(self):
+        return self._application_instance
+
+    def is_enabled(self):
+        return self._is_enabled
+
+    def set_enabled(self, enable):
+        assert isinstance(enable, type(False))
+        if self._is_enabled != enable:
+            self._is_enabled = enable
+            self.on_enabled_changed()
+
+    def set_allow_update(self, allow_updates):
+        if self._allow_updates != allow_updates:
+            self._allow_updates = allow_updates
+            if self._allow_updates and (self._update_requests > 0):
+                self._update_requests = 0
+                self.update()
+
+    def on_enabled_changed(self):
+        pass
+
+    def update(self):
+        pass
+
+    def on_track_list_changed(self):
+        pass
+
+    def on_scene_list_changed(self):
+        pass
+
+    def on_selected_track_changed(self):
+        pass
+
+    def on_selected_scene_changed(self):
+        pass
+
+    def request_rebuild_midi_map(self):
+        self._request_rebuild()
+
+    def _register_timer_callback(self, callback):
+        self._register_timer(callback)
+
+    def _unregister_timer_callback(self, callback):
+        self._unregister_timer(callback)
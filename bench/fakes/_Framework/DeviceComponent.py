@@ -0,0 +1,184 @@
+import Live
+from _Generic.Devices import *
+from ControlSurfaceComponent import ControlSurfaceComponent
+from ButtonElement import ButtonElement
+
+
+class DeviceComponent(ControlSurfaceComponent):
+    ' Class representing a device in Live '
+
+    def __init__(self):
+        ControlSurfaceComponent.__init__(self)
+        self._device_banks = DEVICE_DICT
+        self._device_best_banks = DEVICE_BOB_DICT
+        self._device_bank_names = BANK_NAME_DICT
+        self._device = None
+        self._parameter_controls = None
+        self._bank_up_button = None
+        self._bank_down_button = None
+        self._bank_buttons = None
+        self._on_off_button = None
+        self._lock_button = None
+        self._lock_callback = None
+        self._device_name_data_source = None
+        self._device_bank_registry = {}
+        self._bank_index = 0
+        self._bank_name = '<No Bank>'
+        self._locked_to_device = False
+        self._show_msg_callback = None
+
+    def disconnect(self):
+        if self._device != None:
+            parameter = self._on_off_parameter()
+            if (parameter != None) and parameter.value_has_listener(self._on_on_off_changed):
+                parameter.remove_value_listener(self._on_on_off_changed)
+            if self._device.parameters_has_listener(self._on_parameters_changed):
+                self._device.remove_parameters_listener(self._on_parameters_changed)
+        if self._bank_buttons != None:
+            for button in self._bank_buttons:
+                button.remove_value_listener(self._bank_value)
+        if self._on_off_button != None:
+            self._on_off_button.remove_value_listener(self._on_off_value)
+        self._device = None
+        self._parameter_controls = None
+        self._bank_buttons = None
+        self._on_off_button = None
+
+    def on_enabled_changed(self):
+        self.update()
+
+    def set_device(self, device):
+        if (not self._locked_to_device) and (device != self._device):
+            if self._device != None:
+                self._device.remove_parameters_listener(self._on_parameters_changed)
+                parameter = self._on_off_parameter()
+                if parameter != None:
+                    parameter.remove_value_listener(self._on_on_off_changed)
+                if self._parameter_controls != None:
+                    for control in self._parameter_controls:
+                        control.release_parameter()
+            self._device = device
+            if self._device != None:
+                self._bank_index = 0
+                self._device.add_parameters_listener(self._on_parameters_changed)
+                parameter = self._on_off_parameter()
+                if parameter != None:
+                    parameter.add_value_listener(self._on_on_off_changed)
+            for key in self._device_bank_registry.keys():
+                if key == self._device:
+                    self._bank_index = self._device_bank_registry.get(key, 0)
+                    del self._device_bank_registry[key]
+                    break
+            self._bank_name = '<No Bank>'
+            self._on_device_name_changed()
+            self.update()
+
+    def set_bank_buttons(self, buttons):
+        assert ((buttons == None) or isinstance(buttons, tuple))
+        if self._bank_buttons != None:
+            for button in self._bank_buttons:
+                button.remove_value_listener(self._bank_value)
+        self._bank_buttons = buttons
+        if self._bank_buttons != None:
+            for button in self._bank_buttons:
+                button.add_value_listener(self._bank_value, True)
+        self.update()
+
+    def set_parameter_controls(self, controls):
+        assert (controls != None)
+        assert isinstance(controls, tuple)
+        if (self._device != None) and (self._parameter_controls != None):
+            for control in self._parameter_controls:
+                control.release_parameter()
+        self._parameter_controls = controls
+        self.update()
+
+    def set_on_off_button(self, button):
+        assert ((button == None) or isinstance(button, ButtonElement))
+        if self._on_off_button != None:
+            self._on_off_button.remove_value_listener(self._on_off_value)
+        self._on_off_button = button
+        if self._on_off_button != None:
+            self._on_off_button.add_value_listener(self._on_off_value)
+        self.update()
+
+    def set_show_msg_callback(self, callback):
+        self._show_msg_callback = callback
+
+    def update(self):
+        if self.is_enabled() and (self._device != None):
+            self._device_bank_registry[self._device] = self._bank_index
+            if self._parameter_controls != None:
+                old_bank_name = self._bank_name
+                self._assign_parameters()
+                if (self._bank_name != old_bank_name) and (self._show_msg_callback != None):
+                    self._show_msg_callback(self._device.name + ' Bank: ' + self._bank_name)
+        elif self._parameter_controls != None:
+            for control in self._parameter_controls:
+                control.release_parameter()
+        self._on_on_off_changed()
+
+    def _bank_value(self, value, sender):
+        assert ((sender != None) and (sender in self._bank_buttons))
+        if self.is_enabled() and (self._device != None):
+            if (value != 0) or (not sender.is_momentary()):
+                new_index = list(self._bank_buttons).index(sender)
+                if (new_index != self._bank_index) and (number_of_parameter_banks(self._device) > new_index):
+                    self._bank_name = ''
+                    self._bank_index = new_index
+                    self.update()
+
+    def _on_off_value(self, value):
+        assert (self._on_off_button != None)
+        if self.is_enabled() and (self._device != None):
+            if (value != 0) or (not self._on_off_button.is_momentary()):
+                parameter = self._on_off_parameter()
+                if (parameter != None) and parameter.is_enabled:
+                    parameter.value = float(int(parameter.value == 0.0))
+
+    def _assign_parameters(self):
+        assert self.is_enabled()
+        assert (self._device != None)
+        assert (self._parameter_controls != None)
+        self._bank_name = 'Bank ' + str(self._bank_index + 1)
+        banks = parameter_banks(self._device, self._device_banks)
+        bank_names = parameter_bank_names(self._device, self._device_bank_names)
+        if self._bank_index in range(len(bank_names)):
+            self._bank_name = bank_names[self._bank_index]
+        bank = ()
+        if self._bank_index in range(len(banks)):
+            bank = banks[self._bank_index]
+        for index in range(len(self._parameter_controls)):
+            parameter = None
+            if index < len(bank):
+                parameter = bank[index]
+            if parameter != None:
+                self._parameter_controls[index].connect_to(parameter)
+            else:
+                self._parameter_controls[index].release_parameter()
+
+    def _on_device_name_changed(self):
+        pass
+
+    def _on_parameters_changed(self):
+        self.update()
+
+    def _on_off_parameter(self):
+        result = None
+        if self._device != None:
+            for parameter in self._device.parameters:
+                if str(parameter.name).startswith('Device On'):
+                    result = parameter
+                    break
+        return result
+
+    def _on_on_off_changed(self):
+        if self.is_enabled() and (self._on_off_button != None):
+            turn_on = False
+            if self._device != None:
+                parameter = self._on_off_parameter()
+                turn_on = (parameter != None) and (parameter.value > 0.0)
+            if turn_on:
+                self._on_off_button.turn_on()
+            else:
+                self._on_off_button.turn_off()
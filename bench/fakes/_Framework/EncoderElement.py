@@ -0,0 +1,12 @@
+from InputControlElement import *
+
+
+class EncoderElement(InputControlElement):
+    ' Class representing a continuous control on the controller '
+
+    def __init__(self, msg_type, channel, identifier, map_mode):
+        InputControlElement.__init__(self, msg_type, channel, identifier)
+        self._map_mode = map_mode
+
+    def message_map_mode(self):
+        return self._map_mode
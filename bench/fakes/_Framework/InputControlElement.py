@@ -0,0 +1,147 @@
+from ControlElement import ControlElement
+MIDI_NOTE_TYPE = 0
+MIDI_CC_TYPE = 1
+MIDI_PB_TYPE = 2
+MIDI_MSG_TYPES = (MIDI_NOTE_TYPE, MIDI_CC_TYPE, MIDI_PB_TYPE)
+MIDI_NOTE_ON_STATUS = 144
+MIDI_NOTE_OFF_STATUS = 128
+MIDI_CC_STATUS = 176
+MIDI_PB_STATUS = 224
+
+
+class InputControlElement(ControlElement):
+    ' Base class for all elements that send and receive MIDI '
+
+    _mapping_callback = None
+    _forwarding_callback = None
+    _translation_callback = None
+    _send_midi_callback = None
+    _request_rebuild_callback = None
+
+    def set_surface_callbacks(mapping, forwarding, translation, send_midi, request_rebuild):
+        InputControlElement._mapping_callback = mapping
+        InputControlElement._forwarding_callback = forwarding
+        InputControlElement._translation_callback = translation
+        InputControlElement._send_midi_callback = send_midi
+        InputControlElement._request_rebuild_callback = request_rebuild
+
+    set_surface_callbacks = staticmethod(set_surface_callbacks)
+
+    def __init__(self, msg_type, channel, identifier):
+        assert (msg_type in MIDI_MSG_TYPES)
+        assert (channel in range(16))
+        ControlElement.__init__(self)
+        self._msg_type = msg_type
+        self._msg_channel = channel
+        self._msg_identifier = identifier
+        self._original_channel = channel
+        self._original_identifier = identifier
+        self._install_mapping = InputControlElement._mapping_callback
+        self._install_forwarding = InputControlElement._forwarding_callback
+        self._install_translation = InputControlElement._translation_callback
+        self._send_midi = InputControlElement._send_midi_callback
+        self._request_rebuild = InputControlElement._request_rebuild_callback
+        self._is_mapped = False
+        self._is_being_forwarded = False
+        self._value_notifications = []
+        self._parameter_to_map_to = None
+        self._last_sent_value = -1
+        self._mapping_feedback_delay = 0
+        self._needs_takeover = True
+
+    def message_type(self):
+        return self._msg_type
+
+    def message_channel(self):
+        return self._msg_channel
+
+    def message_identifier(self):
+        return self._msg_identifier
+
+    def set_channel(self, channel):
+        assert (channel in range(16))
+        if self._msg_channel != channel:
+            self._msg_channel = channel
+            self._request_rebuild()
+
+    def set_identifier(self, identifier):
+        if self._msg_identifier != identifier:
+            self._msg_identifier = identifier
+            self._request_rebuild()
+
+    def use_default_message(self):
+        if (self._msg_channel, self._msg_identifier) != (self._original_channel, self._original_identifier):
+            self._msg_channel = self._original_channel
+            self._msg_identifier = self._original_identifier
+            self._request_rebuild()
+
+    def set_needs_takeover(self, needs_takeover):
+        self._needs_takeover = needs_takeover
+
+    def install_connections(self):
+        self._is_mapped = False
+        self._is_being_forwarded = False
+        if (self._msg_channel != self._original_channel) or (self._msg_identifier != self._original_identifier):
+            self._install_translation(self._msg_type, self._original_identifier, self._original_channel, self._msg_identifier, self._msg_channel)
+        if self._parameter_to_map_to != None:
+            self._is_mapped = self._install_mapping(self, self._parameter_to_map_to, self._mapping_feedback_delay)
+        if len(self._value_notifications) > 0:
+            self._is_being_forwarded = self._install_forwarding(self)
+
+    def connect_to(self, parameter):
+        assert (parameter != None)
+        if self._parameter_to_map_to != parameter:
+            self._parameter_to_map_to = parameter
+            self._request_rebuild()
+
+    def release_parameter(self):
+        if self._parameter_to_map_to != None:
+            self._parameter_to_map_to = None
+            self._request_rebuild()
+
+    def mapped_parameter(self):
+        return self._parameter_to_map_to
+
+    def add_value_listener(self, callback, identify_sender = False):
+        assert (not self.value_has_listener(callback))
+        self._value_notifications.append((callback, identify_sender))
+        self._request_rebuild()
+
+    def remove_value_listener(self, callback):
+        for entry in self._value_notifications:
+            if entry[0] == callback:
+                self._value_notifications.remove(entry)
+                self._request_rebuild()
+                return
+        assert False, 'Listener not connected'
+
+    def value_has_listener(self, callback):
+        for entry in self._value_notifications:
+            if entry[0] == callback:
+                return True
+        return False
+
+    def receive_value(self, value):
+        for callback, identify_sender in list(self._value_notifications):
+            if identify_sender:
+                callback(value, self)
+            else:
+                callback(value)
+
+    def _status_byte(self):
+        status_byte = self._original_channel
+        if self._msg_type == MIDI_NOTE_TYPE:
+            status_byte += MIDI_NOTE_ON_STATUS
+        elif self._msg_type == MIDI_CC_TYPE:
+            status_byte += MIDI_CC_STATUS
+        else:
+            status_byte += MIDI_PB_STATUS
+        return status_byte
+
+    def send_value(self, value, force_send = False):
+        assert (value != None)
+        assert isinstance(value, int)
+        assert (value in range(128))
+        if force_send or ((value != self._last_sent_value) and self._is_being_forwarded):
+            if self._send_midi((self._status_byte(), self._original_identifier, value)):
+                self._last_sent_value = value
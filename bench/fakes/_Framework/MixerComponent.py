@@ -0,0 +1,78 @@
+import Live
+from CompoundComponent import CompoundComponent
+from ChannelStripComponent import ChannelStripComponent
+
+
+class MixerComponent(CompoundComponent):
+    ' Class encompassing several channel strips to form a mixer '
+
+    def __init__(self, num_tracks, num_returns = 0):
+        CompoundComponent.__init__(self)
+        self._track_offset = -1
+        self._channel_strips = []
+        for index in range(num_tracks):
+            self._channel_strips.append(self._create_strip())
+            self.register_components(self._channel_strips[index])
+        self._master_strip = self._create_strip()
+        self._selected_strip = self._create_strip()
+        self.register_components(self._master_strip, self._selected_strip)
+        self._crossfader_control = None
+        self._prehear_volume_control = None
+        self._master_strip.set_track(self.song().master_track)
+        self.set_track_offset(0)
+        self.on_selected_track_changed()
+
+    def channel_strip(self, index):
+        assert (index in range(len(self._channel_strips)))
+        return self._channel_strips[index]
+
+    def master_strip(self):
+        return self._master_strip
+
+    def selected_strip(self):
+        return self._selected_strip
+
+    def set_track_offset(self, new_offset):
+        assert (new_offset >= 0)
+        if new_offset != self._track_offset:
+            self._track_offset = new_offset
+            self._reassign_tracks()
+
+    def set_crossfader_control(self, control):
+        if self._crossfader_control != None:
+            self._crossfader_control.release_parameter()
+        self._crossfader_control = control
+        if control != None:
+            control.connect_to(self.song().master_track.mixer_device.crossfader)
+
+    def set_prehear_volume_control(self, control):
+        if self._prehear_volume_control != None:
+            self._prehear_volume_control.release_parameter()
+        self._prehear_volume_control = control
+        if control != None:
+            control.connect_to(self.song().master_track.mixer_device.cue_volume)
+
+    def tracks_to_use(self):
+        return self.song().visible_tracks
+
+    def on_track_list_changed(self):
+        self._reassign_tracks()
+
+    def on_selected_track_changed(self):
+        selected_track = self.song().view.selected_track
+        if selected_track != self.song().master_track:
+            self._selected_strip.set_track(selected_track)
+        else:
+            self._selected_strip.set_track(None)
+
+    def _reassign_tracks(self):
+        tracks = self.tracks_to_use()
+        for index in range(len(self._channel_strips)):
+            track_index = self._track_offset + index
+            if track_index in range(len(tracks)):
+                self._channel_strips[index].set_track(tracks[track_index])
+            else:
+                self._channel_strips[index].set_track(None)
+
+    def _create_strip(self):
+        return ChannelStripComponent()
@@ -0,0 +1,60 @@
+from ControlSurfaceComponent import ControlSurfaceComponent
+from ButtonElement import ButtonElement
+
+
+class ModeSelectorComponent(ControlSurfaceComponent):
+    ' Class for switching between modes, handle several functions with few controls '
+
+    def __init__(self):
+        ControlSurfaceComponent.__init__(self)
+        self._modes_buttons = []
+        self._mode_toggle = None
+        self._mode_index = 0
+
+    def disconnect(self):
+        if self._mode_toggle != None:
+            self._mode_toggle.remove_value_listener(self._toggle_value)
+            self._mode_toggle = None
+
+    def on_enabled_changed(self):
+        self.update()
+
+    def set_mode_toggle(self, button):
+        assert ((button == None) or isinstance(button, ButtonElement))
+        if self._mode_toggle != None:
+            self._mode_toggle.remove_value_listener(self._toggle_value)
+        self._mode_toggle = button
+        if self._mode_toggle != None:
+            self._mode_toggle.add_value_listener(self._toggle_value)
+
+    def set_mode_buttons(self, buttons):
+        for button in self._modes_buttons:
+            button.remove_value_listener(self._mode_value)
+        self._modes_buttons = []
+        if buttons != None:
+            for button in buttons:
+                assert isinstance(button, ButtonElement)
+                self._modes_buttons.append(button)
+                button.add_value_listener(self._mode_value, True)
+        self.update()
+
+    def number_of_modes(self):
+        raise NotImplementedError
+
+    def set_mode(self, mode):
+        assert isinstance(mode, int)
+        assert (mode in range(self.number_of_modes()))
+        if self._mode_index != mode:
+            self._mode_index = mode
+            self.update()
+
+    def _mode_value(self, value, sender):
+        assert (len(self._modes_buttons) > 0)
+        assert (sender in self._modes_buttons)
+        new_mode = list(self._modes_buttons).index(sender)
+        if (value != 0) or (not sender.is_momentary()):
+            self.set_mode(new_mode)
+
+    def _toggle_value(self, value):
+        if (value != 0) or (not self._mode_toggle.is_momentary()):
+            self.set_mode((self._mode_index + 1) % self.number_of_modes())
@@ -0,0 +1,91 @@
+import Live
+from CompoundComponent import CompoundComponent
+from ClipSlotComponent import ClipSlotComponent
+from ButtonElement import ButtonElement
+
+
+class SceneComponent(CompoundComponent):
+    ' Class representing a scene in Live '
+
+    def __init__(self, num_slots, tracks_to_use_callback):
+        CompoundComponent.__init__(self)
+        self._scene = None
+        self._clip_slots = []
+        self._tracks_to_use_callback = tracks_to_use_callback
+        for index in range(num_slots):
+            new_slot = self._create_clip_slot()
+            self._clip_slots.append(new_slot)
+            self.register_components(new_slot)
+        self._launch_button = None
+        self._triggered_value = 127
+        self._track_offset = 0
+
+    def disconnect(self):
+        CompoundComponent.disconnect(self)
+        if self._launch_button != None:
+            self._launch_button.remove_value_listener(self._launch_value)
+            self._launch_button = None
+
+    def on_enabled_changed(self):
+        self.update()
+
+    def set_scene(self, scene):
+        if scene != self._scene:
+            self._scene = scene
+            self.set_track_offset(self._track_offset, True)
+            self.update()
+
+    def set_scene_and_track_offset(self, scene, offset):
+        self._scene = scene
+        self.set_track_offset(offset, True)
+        self.update()
+
+    def set_launch_button(self, button):
+        assert ((button == None) or isinstance(button, ButtonElement))
+        if button != self._launch_button:
+            if self._launch_button != None:
+                self._launch_button.remove_value_listener(self._launch_value)
+            self._launch_button = button
+            if self._launch_button != None:
+                self._launch_button.add_value_listener(self._launch_value)
+            self.update()
+
+    def set_triggered_value(self, value):
+        self._triggered_value = value
+
+    def set_track_offset(self, offset, force = False):
+        assert (offset >= 0)
+        if force or (offset != self._track_offset):
+            self._track_offset = offset
+            tracks = self._tracks_to_use_callback()
+            scene_index = -1
+            if self._scene != None:
+                scene_index = list(self.song().scenes).index(self._scene)
+            for index in range(len(self._clip_slots)):
+                track_index = offset + index
+                if (scene_index >= 0) and (track_index < len(tracks)) and (scene_index < len(tracks[track_index].clip_slots)):
+                    self._clip_slots[index].set_clip_slot(tracks[track_index].clip_slots[scene_index])
+                else:
+                    self._clip_slots[index].set_clip_slot(None)
+
+    def clip_slot(self, index):
+        assert (index in range(len(self._clip_slots)))
+        return self._clip_slots[index]
+
+    def update(self):
+        if self._allow_updates:
+            if self.is_enabled() and (self._launch_button != None):
+                if (self._scene != None) and self._scene.is_triggered:
+                    self._launch_button.send_value(self._triggered_value)
+                else:
+                    self._launch_button.turn_off()
+        else:
+            self._update_requests += 1
+
+    def _create_clip_slot(self):
+        return ClipSlotComponent()
+
+    def _launch_value(self, value):
+        if self.is_enabled() and (self._scene != None):
+            if (value != 0) or (not self._launch_button.is_momentary()):
+                self._scene.fire()
@@ -0,0 +1,235 @@
+import Live
+from CompoundComponent import CompoundComponent
+from SceneComponent import SceneComponent
+from ButtonElement import ButtonElement
+
+
+class SessionComponent(CompoundComponent):
+    ' Class encompassing several scenes to cover a defined section of Live\'s session '
+
+    _linked_session_instances = []
+
+    def __init__(self, num_tracks, num_scenes):
+        CompoundComponent.__init__(self)
+        self._track_offset = 0
+        self._scene_offset = 0
+        self._num_tracks = num_tracks
+        self._bank_up_button = None
+        self._bank_down_button = None
+        self._bank_right_button = None
+        self._bank_left_button = None
+        self._stop_all_button = None
+        self._stop_track_clip_buttons = None
+        self._stop_track_clip_value = 127
+        self._offset_callbacks = []
+        self._mixer = None
+        self._scenes = []
+        for index in range(num_scenes):
+            self._scenes.append(self._create_scene(self._num_tracks))
+            self.register_components(self._scenes[index])
+        self._selected_scene = self._create_scene(self._num_tracks)
+        self.register_components(self._selected_scene)
+        self.on_selected_scene_changed()
+        self._reassign_scenes()
+
+    def disconnect(self):
+        if self._is_linked():
+            self._unlink()
+        CompoundComponent.disconnect(self)
+        for name, callback in (('_bank_up_button', self._bank_up_value), ('_bank_down_button', self._bank_down_value), ('_bank_right_button', self._bank_right_value), ('_bank_left_button', self._bank_left_value), ('_stop_all_button', self._stop_all_value)):
+            button = getattr(self, name)
+            if button != None:
+                button.remove_value_listener(callback)
+                setattr(self, name, None)
+        if self._stop_track_clip_buttons != None:
+            for button in self._stop_track_clip_buttons:
+                button.remove_value_listener(self._stop_track_value)
+            self._stop_track_clip_buttons = None
+
+    def scene(self, index):
+        assert (index in range(len(self._scenes)))
+        return self._scenes[index]
+
+    def selected_scene(self):
+        return self._selected_scene
+
+    def set_mixer(self, mixer):
+        self._mixer = mixer
+        if self._mixer != None:
+            self._mixer.set_track_offset(self.track_offset())
+
+    def _set_button(self, name, button, callback):
+        assert ((button == None) or isinstance(button, ButtonElement))
+        old_button = getattr(self, name)
+        if old_button != button:
+            if old_button != None:
+                old_button.remove_value_listener(callback)
+            setattr(self, name, button)
+            if button != None:
+                button.add_value_listener(callback)
+
+    def set_track_bank_buttons(self, right_button, left_button):
+        self._set_button('_bank_right_button', right_button, self._bank_right_value)
+        self._set_button('_bank_left_button', left_button, self._bank_left_value)
+
+    def set_scene_bank_buttons(self, down_button, up_button):
+        self._set_button('_bank_down_button', down_button, self._bank_down_value)
+        self._set_button('_bank_up_button', up_button, self._bank_up_value)
+
+    def set_stop_all_clips_button(self, button):
+        self._set_button('_stop_all_button', button, self._stop_all_value)
+
+    def set_stop_track_clip_buttons(self, buttons):
+        if self._stop_track_clip_buttons != None:
+            for button in self._stop_track_clip_buttons:
+                button.remove_value_listener(self._stop_track_value)
+        self._stop_track_clip_buttons = buttons
+        if self._stop_track_clip_buttons != None:
+            for button in self._stop_track_clip_buttons:
+                button.add_value_listener(self._stop_track_value, True)
+
+    def set_stop_track_clip_value(self, value):
+        self._stop_track_clip_value = value
+
+    def add_offset_listener(self, callback):
+        assert (callback not in self._offset_callbacks)
+        self._offset_callbacks.append(callback)
+
+    def remove_offset_listener(self, callback):
+        assert (callback in self._offset_callbacks)
+        self._offset_callbacks.remove(callback)
+
+    def offset_has_listener(self, callback):
+        return callback in self._offset_callbacks
+
+    def track_offset(self):
+        return self._track_offset
+
+    def scene_offset(self):
+        return self._scene_offset
+
+    def width(self):
+        return self._num_tracks
+
+    def height(self):
+        return len(self._scenes)
+
+    def tracks_to_use(self):
+        if self._mixer != None:
+            return self._mixer.tracks_to_use()
+        return self.song().visible_tracks
+
+    def set_offsets(self, track_offset, scene_offset):
+        assert (track_offset >= 0)
+        assert (scene_offset >= 0)
+        track_increment = 0
+        scene_increment = 0
+        if len(self.tracks_to_use()) > track_offset:
+            track_increment = track_offset - self._track_offset
+        if len(self.song().scenes) > scene_offset:
+            scene_increment = scene_offset - self._scene_offset
+        if self._is_linked():
+            for session in SessionComponent._linked_session_instances:
+                session._change_offsets(track_increment, scene_increment)
+        else:
+            self._change_offsets(track_increment, scene_increment)
+
+    def _change_offsets(self, track_increment, scene_increment):
+        offsets_changed = (track_increment != 0) or (scene_increment != 0)
+        if offsets_changed:
+            self._track_offset += track_increment
+            self._scene_offset += scene_increment
+            assert (self._track_offset >= 0)
+            assert (self._scene_offset >= 0)
+            if self._mixer != None:
+                self._mixer.set_track_offset(self.track_offset())
+            self._reassign_tracks()
+            self._reassign_scenes()
+            for callback in list(self._offset_callbacks):
+                callback()
+            if (self.width() > 0) and (self.height() > 0):
+                self._do_show_highlight()
+
+    def _do_show_highlight(self):
+        pass
+
+    def on_enabled_changed(self):
+        self.update()
+
+    def update(self):
+        if self._allow_updates:
+            self._reassign_tracks()
+        else:
+            self._update_requests += 1
+
+    def on_track_list_changed(self):
+        self._reassign_tracks()
+        self._reassign_scenes()
+
+    def on_scene_list_changed(self):
+        self._reassign_scenes()
+
+    def on_selected_scene_changed(self):
+        self._selected_scene.set_scene(self.song().view.selected_scene)
+
+    def _reassign_tracks(self):
+        if self.is_enabled() and (self._stop_track_clip_buttons != None):
+            tracks = self.tracks_to_use()
+            for index in range(len(self._stop_track_clip_buttons)):
+                if (self._track_offset + index) < len(tracks):
+                    self._stop_track_clip_buttons[index].send_value(self._stop_track_clip_value)
+                else:
+                    self._stop_track_clip_buttons[index].turn_off()
+
+    def _reassign_scenes(self):
+        scenes = self.song().scenes
+        for index in range(len(self._scenes)):
+            scene_index = self._scene_offset + index
+            scene = None
+            if scene_index < len(scenes):
+                scene = scenes[scene_index]
+            self._scenes[index].set_scene_and_track_offset(scene, self._track_offset)
+
+    def _create_scene(self, num_tracks):
+        return SceneComponent(num_tracks, self.tracks_to_use)
+
+    def _is_linked(self):
+        return self in SessionComponent._linked_session_instances
+
+    def _link(self):
+        assert (not self._is_linked())
+        SessionComponent._linked_session_instances.append(self)
+
+    def _unlink(self):
+        assert self._is_linked()
+        SessionComponent._linked_session_instances.remove(self)
+
+    def _bank_up_value(self, value):
+        if self.is_enabled() and ((value != 0) or (not self._bank_up_button.is_momentary())):
+            if self._scene_offset > 0:
+                self.set_offsets(self._track_offset, self._scene_offset - 1)
+
+    def _bank_down_value(self, value):
+        if self.is_enabled() and ((value != 0) or (not self._bank_down_button.is_momentary())):
+            self.set_offsets(self._track_offset, self._scene_offset + 1)
+
+    def _bank_right_value(self, value):
+        if self.is_enabled() and ((value != 0) or (not self._bank_right_button.is_momentary())):
+            self.set_offsets(self._track_offset + 1, self._scene_offset)
+
+    def _bank_left_value(self, value):
+        if self.is_enabled() and ((value != 0) or (not self._bank_left_button.is_momentary())):
+            if self._track_offset > 0:
+                self.set_offsets(self._track_offset - 1, self._scene_offset)
+
+    def _stop_all_value(self, value):
+        if self.is_enabled() and (value != 0):
+            self.song().stop_all_clips()
+
+    def _stop_track_value(self, value, sender):
+        if self.is_enabled() and (value != 0):
+            tracks = self.tracks_to_use()
+            track_index = list(self._stop_track_clip_buttons).index(sender) + self._track_offset
+            if track_index < len(tracks):
+                for slot in tracks[track_index].clip_slots:
+                    slot.stop()
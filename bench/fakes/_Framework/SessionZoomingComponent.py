@@ -0,0 +1,159 @@
+import Live
+from ControlSurfaceComponent import ControlSurfaceComponent
+from ButtonElement import ButtonElement
+from ButtonMatrixElement import ButtonMatrixElement
+from SessionComponent import SessionComponent
+
+
+class SessionZoomingComponent(ControlSurfaceComponent):
+    ' Class using a matrix of buttons to choose blocks of clips in the session '
+
+    def __init__(self, session):
+        assert isinstance(session, SessionComponent)
+        ControlSurfaceComponent.__init__(self)
+        self._session = session
+        self._session.add_offset_listener(self._on_session_offset_changes)
+        self._buttons = None
+        self._zoom_button = None
+        self._nav_up_button = None
+        self._nav_down_button = None
+        self._nav_left_button = None
+        self._nav_right_button = None
+        self._scene_bank_buttons = None
+        self._scene_bank_index = 0
+        self._is_zoomed_out = False
+        self._stopped_value = 100
+        self._selected_value = 127
+        self._empty_value = 0
+
+    def disconnect(self):
+        self._session.remove_offset_listener(self._on_session_offset_changes)
+        self.set_button_matrix(None)
+        self.set_zoom_button(None)
+        self.set_nav_buttons(None, None, None, None)
+        self.set_scene_bank_buttons(None)
+        self._session = None
+
+    def set_button_matrix(self, buttons):
+        assert ((buttons == None) or isinstance(buttons, ButtonMatrixElement))
+        if buttons != self._buttons:
+            if self._buttons != None:
+                self._buttons.remove_value_listener(self._matrix_value)
+            self._buttons = buttons
+            if self._buttons != None:
+                self._buttons.add_value_listener(self._matrix_value)
+            self.update()
+
+    def set_zoom_button(self, button):
+        assert ((button == None) or (isinstance(button, ButtonElement) and button.is_momentary()))
+        if button != self._zoom_button:
+            if self._zoom_button != None:
+                self._zoom_button.remove_value_listener(self._zoom_value)
+            self._zoom_button = button
+            if self._zoom_button != None:
+                self._zoom_button.add_value_listener(self._zoom_value)
+            self.update()
+
+    def set_nav_buttons(self, up, down, left, right):
+        for button in (self._nav_up_button, self._nav_down_button, self._nav_left_button, self._nav_right_button):
+            if button != None:
+                button.remove_value_listener(self._nav_value)
+        self._nav_up_button = up
+        self._nav_down_button = down
+        self._nav_left_button = left
+        self._nav_right_button = right
+        for button in (up, down, left, right):
+            if button != None:
+                button.add_value_listener(self._nav_value, True)
+        self.update()
+
+    def set_scene_bank_buttons(self, buttons):
+        if self._scene_bank_buttons != None:
+            for button in self._scene_bank_buttons:
+                button.remove_value_listener(self._scene_bank_value)
+        self._scene_bank_buttons = buttons
+        if self._scene_bank_buttons != None:
+            for button in self._scene_bank_buttons:
+                button.add_value_listener(self._scene_bank_value, True)
+        self.update()
+
+    def set_stopped_value(self, value):
+        self._stopped_value = value
+
+    def set_selected_value(self, value):
+        self._selected_value = value
+
+    def on_enabled_changed(self):
+        self.update()
+
+    def on_scene_list_changed(self):
+        self.update()
+
+    def on_track_list_changed(self):
+        self.update()
+
+    def update(self):
+        if self._session == None:
+            return
+        if self.is_enabled() and self._is_zoomed_out:
+            self._session.set_enabled(False)
+            if self._buttons != None:
+                tracks = self._session.tracks_to_use()
+                scenes = self.song().scenes
+                width = self._session.width()
+                height = self._session.height()
+                for y in range(self._buttons.height()):
+                    scene_block = (self._scene_bank_index * self._buttons.height()) + y
+                    for x in range(self._buttons.width()):
+                        value = self._empty_value
+                        if ((x * width) < len(tracks)) and ((scene_block * height) < len(scenes)):
+                            value = self._stopped_value
+                            if ((self._session.track_offset() / width) == x) and ((self._session.scene_offset() / height) == scene_block):
+                                value = self._selected_value
+                        self._buttons.send_value(x, y, value)
+            if self._scene_bank_buttons != None:
+                for index in range(len(self._scene_bank_buttons)):
+                    if index == self._scene_bank_index:
+                        self._scene_bank_buttons[index].turn_on()
+                    else:
+                        self._scene_bank_buttons[index].turn_off()
+        elif self.is_enabled():
+            self._session.set_enabled(True)
+
+    def _on_session_offset_changes(self):
+        if self._is_zoomed_out:
+            self.update()
+
+    def _zoom_value(self, value):
+        assert (self._zoom_button != None)
+        if self.is_enabled():
+            self._is_zoomed_out = (value > 0)
+            if self._is_zoomed_out:
+                self._scene_bank_index = int((self._session.scene_offset() / self._session.height()) / self._buttons.height())
+            self.update()
+
+    def _nav_value(self, value, sender):
+        if self.is_enabled() and self._is_zoomed_out and ((value != 0) or (not sender.is_momentary())):
+            track_offset = self._session.track_offset()
+            scene_offset = self._session.scene_offset()
+            if sender == self._nav_up_button:
+                scene_offset = max(0, scene_offset - self._session.height())
+            elif sender == self._nav_down_button:
+                scene_offset += self._session.height()
+            elif sender == self._nav_left_button:
+                track_offset = max(0, track_offset - self._session.width())
+            elif sender == self._nav_right_button:
+                track_offset += self._session.width()
+            self._session.set_offsets(track_offset, scene_offset)
+
+    def _matrix_value(self, value, x, y, is_momentary):
+        if self.is_enabled() and self._is_zoomed_out and ((value != 0) or (not is_momentary)):
+            track_offset = x * self._session.width()
+            scene_offset = ((self._scene_bank_index * self._buttons.height()) + y) * self._session.height()
+            if (track_offset < len(self._session.tracks_to_use())) and (scene_offset < len(self.song().scenes)):
+                self._session.set_offsets(track_offset, scene_offset)
+
+    def _scene_bank_value(self, value, sender):
+        if self.is_enabled() and self._is_zoomed_out and ((value != 0) or (not sender.is_momentary())):
+            self._scene_bank_index = list(self._scene_bank_buttons).index(sender)
+            self.update()
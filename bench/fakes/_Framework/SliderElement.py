@@ -0,0 +1,9 @@
+import Live
+from EncoderElement import EncoderElement
+
+
+class SliderElement(EncoderElement):
+    ' Class representing a slider on the controller '
+
+    def __init__(self, msg_type, channel, identifier):
+        EncoderElement.__init__(self, msg_type, channel, identifier, Live.MidiMap.MapMode.absolute)
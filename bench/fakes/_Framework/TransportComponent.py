@@ -0,0 +1,127 @@
+import Live
+from ControlSurfaceComponent import ControlSurfaceComponent
+from ButtonElement import ButtonElement
+
+
+class TransportComponent(ControlSurfaceComponent):
+    ' Class encapsulating all functions in Live\'s transport section '
+
+    def __init__(self):
+        ControlSurfaceComponent.__init__(self)
+        self._play_button = None
+        self._stop_button = None
+        self._record_button = None
+        self._nudge_up_button = None
+        self._nudge_down_button = None
+        self._tap_tempo_button = None
+        self._metronome_button = None
+        self._overdub_button = None
+        self.song().add_is_playing_listener(self._on_playing_status_changed)
+        self.song().add_record_mode_listener(self._on_record_status_changed)
+        self.song().add_metronome_listener(self._on_metronome_changed)
+        self.song().add_overdub_listener(self._on_overdub_changed)
+
+    def disconnect(self):
+        self.song().remove_is_playing_listener(self._on_playing_status_changed)
+        self.song().remove_record_mode_listener(self._on_record_status_changed)
+        self.song().remove_metronome_listener(self._on_metronome_changed)
+        self.song().remove_overdub_listener(self._on_overdub_changed)
+        for name in ('play', 'stop', 'record', 'nudge_up', 'nudge_down', 'tap_tempo', 'metronome', 'overdub'):
+            button = getattr(self, '_' + name + '_button')
+            if button != None:
+                button.remove_value_listener(getattr(self, '_' + name + '_value'))
+                setattr(self, '_' + name + '_button', None)
+
+    def on_enabled_changed(self):
+        self.update()
+
+    def update(self):
+        self._on_playing_status_changed()
+        self._on_record_status_changed()
+        self._on_metronome_changed()
+        self._on_overdub_changed()
+
+    def _set_button(self, name, button):
+        assert ((button == None) or isinstance(button, ButtonElement))
+        callback = getattr(self, '_' + name + '_value')
+        old_button = getattr(self, '_' + name + '_button')
+        if old_button != button:
+            if old_button != None:
+                old_button.remove_value_listener(callback)
+            setattr(self, '_' + name + '_button', button)
+            if button != None:
+                button.add_value_listener(callback)
+            self.update()
+
+    def set_play_button(self, button):
+        self._set_button('play', button)
+
+    def set_stop_button(self, button):
+        self._set_button('stop', button)
+
+    def set_record_button(self, button):
+        self._set_button('record', button)
+
+    def set_nudge_buttons(self, up_button, down_button):
+        self._set_button('nudge_up', up_button)
+        self._set_button('nudge_down', down_button)
+
+    def set_tap_tempo_button(self, button):
+        self._set_button('tap_tempo', button)
+
+    def set_metronome_button(self, button):
+        self._set_button('metronome', button)
+
+    def set_overdub_button(self, button):
+        self._set_button('overdub', button)
+
+    def _play_value(self, value):
+        if self.is_enabled() and (value != 0):
+            self.song().start_playing()
+
+    def _stop_value(self, value):
+        if self.is_enabled() and (value != 0):
+            self.song().stop_playing()
+
+    def _record_value(self, value):
+        if self.is_enabled() and (value != 0):
+            self.song().record_mode = not self.song().record_mode
+
+    def _nudge_up_value(self, value):
+        if self.is_enabled():
+            self.song().nudge_up = (value != 0)
+
+    def _nudge_down_value(self, value):
+        if self.is_enabled():
+            self.song().nudge_down = (value != 0)
+
+    def _tap_tempo_value(self, value):
+        if self.is_enabled() and (value != 0):
+            self.song().tap_tempo()
+
+    def _metronome_value(self, value):
+        if self.is_enabled() and (value != 0):
+            self.song().metronome = not self.song().metronome
+
+    def _overdub_value(self, value):
+        if self.is_enabled() and (value != 0):
+            self.song().overdub = not self.song().overdub
+
+    def _update_button(self, button, state):
+        if self.is_enabled() and (button != None):
+            if state:
+                button.turn_on()
+            else:
+                button.turn_off()
+
+    def _on_playing_status_changed(self):
+        self._update_button(self._play_button, self.song().is_playing)
+
+    def _on_record_status_changed(self):
+        self._update_button(self._record_button, self.song().record_mode)
+
+    def _on_metronome_changed(self):
+        self._update_button(self._metronome_button, self.song().metronome)
+
+    def _on_overdub_changed(self):
+        self._update_button(self._overdub_button, self.song().overdub)
@@ -0,0 +1,48 @@
+""" Stand-in for _Generic.Devices: parameter bank tables for a few built-in devices """
+
+DEVICE_DICT = {'Operator': (('Oscillator', 'Osc-A Level', 'Osc-B Level', 'Osc-C Level', 'Osc-D Level', 'Transpose', 'Filter Freq', 'Filter Res'), ('A Coarse', 'A Fine', 'B Coarse', 'B Fine', 'C Coarse', 'C Fine', 'D Coarse', 'D Fine')),
+ 'AutoFilter': (('Filter Type', 'Frequency', 'Resonance', 'Env. Modulation', 'Env. Attack', 'Env. Release', 'LFO Amount', 'LFO Frequency'),)}
+DEVICE_BOB_DICT = {'Operator': DEVICE_DICT['Operator'][0],
+ 'AutoFilter': DEVICE_DICT['AutoFilter'][0]}
+BANK_NAME_DICT = {'Operator': ('Oscillators', 'Tuning')}
+
+
+def device_parameters_to_map(device):
+    return tuple(device.parameters[1:])
+
+
+def get_parameter_by_name(device, name):
+    for parameter in device.parameters:
+        if parameter.name == name:
+            return parameter
+    return None
+
+
+def number_of_parameter_banks(device, device_dict = DEVICE_DICT):
+    result = 0
+    if device != None:
+        if device.class_name in device_dict.keys():
+            result = len(device_dict[device.class_name])
+        else:
+            param_count = len(list(device.parameters))
+            result = param_count / 8
+            if not ((param_count % 8) == 0):
+                result += 1
+    return result
+
+
+def parameter_banks(device, device_dict = DEVICE_DICT):
+    if device != None:
+        if device.class_name in device_dict.keys():
+            return [ [ get_parameter_by_name(device, name) for name in bank ] for bank in device_dict[device.class_name] ]
+        parameters = device_parameters_to_map(device)
+        return [ parameters[index:index + 8] for index in range(0, len(parameters), 8) ]
+    return []
+
+
+def parameter_bank_names(device, bank_name_dict = BANK_NAME_DICT):
+    if device != None:
+        if device.class_name in bank_name_dict.keys():
+            return bank_name_dict[device.class_name]
+        return [ 'Bank ' + str(index + 1) for index in range(number_of_parameter_banks(device)) ]
+    return []
@@ -0,0 +1,146 @@
+""" Runs the APC40 script outside of Live against the stand-ins in bench/fakes """
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPT_DIR = os.path.dirname(BENCH_DIR)
+for path in (SCRIPT_DIR, os.path.join(BENCH_DIR, 'fakes')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+import Live
+from APC import MANUFACTURER_ID
+from APC40 import APC40
+NOTE_ON_STATUS = 144
+NOTE_OFF_STATUS = 128
+CC_STATUS = 176
+
+
+class FakeCInstance(object):
+    ' Plays the part of the c_instance Live hands to a control surface script '
+
+    def __init__(self, song):
+        self._song = song
+        self.sent_midi = []
+        # What the controller shows: last value per (status, id), note offs as note ons of 0
+        self.leds = {}
+        self.log = []
+        self.messages = []
+        self.rebuild_requests = 0
+
+    def song(self):
+        return self._song
+
+    def send_midi(self, midi_bytes):
+        self.sent_midi.append(midi_bytes)
+        if len(midi_bytes) == 3:
+            status = midi_bytes[0]
+            value = midi_bytes[2]
+            if (status & 240) == NOTE_OFF_STATUS:
+                status += 16
+                value = 0
+            self.leds[(status, midi_bytes[1])] = value
+
+    def log_message(self, message):
+        self.log.append(message)
+
+    def show_message(self, message):
+        self.messages.append(message)
+
+    def request_rebuild_midi_map(self):
+        self.rebuild_requests += 1
+
+    def set_session_highlight(self, track_offset, scene_offset, width, height, include_return_tracks):
+        pass
+
+
+class HeadlessRig(object):
+    ' An APC40 script instance wired to a fake song and a fake controller '
+
+    def __init__(self, num_tracks = 16, num_scenes = 40, num_returns = 3, song = None):
+        if song == None:
+            song = Live.Song.Song(num_tracks, num_scenes, num_returns)
+        self.song = song
+        self.c_instance = FakeCInstance(self.song)
+        self.script = APC40(self.c_instance)
+        self.rebuilds = 0
+        self._device_id = 5
+
+    def disconnect(self):
+        self.script.disconnect()
+
+    def tick(self, count = 1):
+        ' Advances Live\'s 100ms display timer, building the MIDI map first if one was requested '
+        for index in range(count):
+            self.rebuild_if_requested()
+            self.script.update_display()
+        self.rebuild_if_requested()
+
+    def rebuild_if_requested(self):
+        if self.c_instance.rebuild_requests > 0:
+            self.c_instance.rebuild_requests = 0
+            self.rebuilds += 1
+            self.script.build_midi_map(None)
+
+    def handshake(self):
+        ' Goes through refresh_state, the identity request and the dongle challenge '
+        self.script.refresh_state()
+        self.tick(6)
+        identity_request = (240, 126, 0, 6, 1, 247)
+        assert identity_request in self.c_instance.sent_midi, 'script never sent an identity request'
+        self.receive((240, 126, self._device_id, 6, 2, MANUFACTURER_ID, self.script._product_model_id_byte(), 1, 0, 0, 0, 1, 0, self._device_id, 0, 0, 0, 0, 0, 0, 247))
+        challenge = [ message for message in self.c_instance.sent_midi if (len(message) > 6) and (message[4] == 80) ][-1]
+        nibbles = challenge[7:23]
+        values = [0, 0]
+        for index in range(8):
+            values[0] += nibbles[index] << (4 * (7 - index))
+            values[1] += nibbles[8 + index] << (4 * (7 - index))
+        response = Live.Application.encrypt_challenge(values[0], values[1])
+        response_nibbles = [ (response[index / 8] >> (4 * (7 - (index % 8)))) & 15 for index in range(16) ]
+        self.receive(tuple([240, MANUFACTURER_ID, self._device_id, self.script._product_model_id_byte(), 81, 0, 16] + response_nibbles + [247]))
+        self.tick()
+
+    def receive(self, midi_bytes):
+        self.script.receive_midi(midi_bytes)
+        self.rebuild_if_requested()
+
+    def press(self, status, identifier, channel = 0):
+        self.receive((status + channel, identifier, 127))
+
+    def release(self, status, identifier, channel = 0):
+        if status == NOTE_ON_STATUS:
+            status = NOTE_OFF_STATUS
+        self.receive((status + channel, identifier, 0))
+
+    def tap(self, identifier, channel = 0):
+        self.press(NOTE_ON_STATUS, identifier, channel)
+        self.release(NOTE_ON_STATUS, identifier, channel)
+
+    def take_sent_midi(self):
+        sent = self.c_instance.sent_midi
+        self.c_instance.sent_midi = []
+        return sent
+
+    def control(self, name):
+        for control in self.script.controls:
+            if control.name == name:
+                return control
+        raise KeyError(name)
+
+    def component(self, name):
+        for component in self.script.components:
+            if component.name == name:
+                return component
+        raise KeyError(name)
+
+
+def timed(callback, repeats = 1):
+    ' Returns seconds per call of callback, measured with the highest resolution clock available '
+    clock = time.time
+    if sys.platform == 'win32':
+        clock = time.clock
+    start = clock()
+    for index in range(repeats):
+        callback()
+    return (clock() - start) / repeats
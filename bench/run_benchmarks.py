@@ -0,0 +1,140 @@
+""" Benchmarks the APC40 script against the headless rig. Run with the Python 2 that matches Live's:
+
+    python bench/run_benchmarks.py [--events N]
+
+For each scenario it reports the CPU time per event, how many such events a second the script can
+handle, the MIDI messages each event sends, and the message rate at Live's 100ms timer rate """
+import random
+import sys
+from optparse import OptionParser
+
+from headless import HeadlessRig, NOTE_ON_STATUS, timed
+import Live
+
+TICKS_PER_SECOND = 10
+SHIFT_ID = 98
+BANK_RIGHT_ID = 96
+BANK_LEFT_ID = 97
+ENCODER_MODE_IDS = (87, 88, 89, 90)
+
+
+def make_rig():
+    rig = HeadlessRig()
+    # A device on every track, so the device component has parameters to map
+    for track in rig.song.tracks:
+        track.set_devices([Live.Device.Device('Chorus', 'Chorus', 40)])
+    rig.handshake()
+    rig.tick(10)
+    rig.take_sent_midi()
+    return rig
+
+
+def meter_stream(rig):
+    ' Every track and the master move on every tick, as with a busy mix '
+    source = random.Random(0)
+    tracks = list(rig.song.tracks) + [rig.song.master_track]
+    frames = [ [ 0.4 + (0.55 * source.random()) for track in tracks ] for index in range(64) ]
+    state = {'frame': 0}
+    def event():
+        frame = frames[state['frame'] % len(frames)]
+        state['frame'] += 1
+        for index in range(len(tracks)):
+            tracks[index].set_meters(frame[index], frame[index])
+        rig.tick()
+    return event
+
+
+def session_scroll(rig):
+    ' Pages the session ring right and back left '
+    state = {'right': True}
+    def event():
+        if state['right']:
+            rig.tap(BANK_RIGHT_ID)
+        else:
+            rig.tap(BANK_LEFT_ID)
+        state['right'] = not state['right']
+        rig.tick()
+    return event
+
+
+def bank_hold(rig):
+    ' One tick of holding a track bank button, turning around at either end of the set '
+    session = rig.script._session
+    state = {'button': BANK_RIGHT_ID}
+    rig.press(NOTE_ON_STATUS, state['button'])
+    def event():
+        turn = None
+        if (state['button'] == BANK_RIGHT_ID) and (session.track_offset() == (len(session.tracks_to_use()) - 1)):
+            turn = BANK_LEFT_ID
+        elif (state['button'] == BANK_LEFT_ID) and (session.track_offset() == 0):
+            turn = BANK_RIGHT_ID
+        if turn != None:
+            rig.release(NOTE_ON_STATUS, state['button'])
+            state['button'] = turn
+            rig.press(NOTE_ON_STATUS, turn)
+        rig.tick()
+    return event
+
+
+def shift_press(rig):
+    ' One press or release of shift '
+    state = {'down': False}
+    def event():
+        if state['down']:
+            rig.release(NOTE_ON_STATUS, SHIFT_ID)
+        else:
+            rig.press(NOTE_ON_STATUS, SHIFT_ID)
+        state['down'] = not state['down']
+        rig.tick()
+    return event
+
+
+def mode_switch(rig):
+    ' Steps the track control encoders through pan and the sends '
+    state = {'mode': 0}
+    def event():
+        state['mode'] = (state['mode'] + 1) % len(ENCODER_MODE_IDS)
+        rig.tap(ENCODER_MODE_IDS[state['mode']])
+        rig.tick()
+    return event
+
+
+SCENARIOS = (('meter_stream', meter_stream),
+             ('session_scroll', session_scroll),
+             ('bank_hold', bank_hold),
+             ('shift_press', shift_press),
+             ('mode_switch', mode_switch))
+
+
+def run_scenario(name, setup, events):
+    rig = make_rig()
+    event = setup(rig)
+    # Warm up, so one-off work like the first redraw is not counted
+    for index in range(8):
+        event()
+    rig.take_sent_midi()
+    rebuilds = rig.rebuilds
+    seconds = timed(event, events)
+    messages = len(rig.take_sent_midi())
+    rebuilds = rig.rebuilds - rebuilds
+    rig.disconnect()
+    return (name, seconds, float(messages) / events, float(rebuilds) / events)
+
+
+def main(argv):
+    parser = OptionParser(usage = '%prog [--events N] [scenario ...]')
+    parser.add_option('-n', '--events', type = 'int', default = 1000, help = 'events per scenario')
+    options, names = parser.parse_args(argv)
+    scenarios = [ scenario for scenario in SCENARIOS if (len(names) == 0) or (scenario[0] in names) ]
+    print '%-16s %12s %12s %10s %14s %10s' % ('scenario', 'us/event', 'events/sec', 'midi/event', 'midi/sec@10Hz', 'rebuilds')
+    for name, setup in scenarios:
+        name, seconds, messages, rebuilds = run_scenario(name, setup, options.events)
+        events_per_second = 0.0
+        if seconds > 0:
+            events_per_second = 1.0 / seconds
+        print '%-16s %12.1f %12.0f %10.1f %14.1f %10.2f' % (name, seconds * 1000000, events_per_second, messages, messages * TICKS_PER_SECOND, rebuilds)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))